@@ -0,0 +1,481 @@
+"""
+プロキシチェックのベンチマーク
+ローカルに偽のプロキシ群とIPエコーサーバー、メモリ上のワークシートを用意し、
+check_all_proxies と write_results の速度・API呼び出し回数を計測する
+"""
+
+import asyncio
+import io
+import json
+import os
+import random
+import sys
+import threading
+import time
+from contextlib import redirect_stdout
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+import ip_echo_server
+from proxy_checker import ProxyChecker, SheetsApiScheduler, StreamingResultWriter
+from tests.fake_sheets import InMemoryWorksheet
+
+
+# 偽プロキシの振る舞い
+BEHAVIOR_OK = "ok"
+BEHAVIOR_FAIL = "fail"
+BEHAVIOR_AUTH = "auth"
+BEHAVIOR_TIMEOUT = "timeout"
+
+
+class MockProxyFarm:
+    """
+    ローカルで動く偽のHTTPプロキシ群
+
+    各プロキシは別々のポートで待ち受け、振る舞い（正常・502エラー・407認証エラー・応答なし）と
+    応答遅延を設定できる。正常なプロキシはリクエストをIPエコーサーバーに転送する。
+    """
+
+    def __init__(self, count: int = 100, latency: float = 0.05, failure_rate: float = 0.1,
+                 auth_failure_rate: float = 0.05, timeout_rate: float = 0.05, seed: int = 1):
+        """
+        初期化
+
+        Args:
+            count: プロキシの数
+            latency: 各リクエストに加える遅延（秒）
+            failure_rate: 502エラーを返すプロキシの割合
+            auth_failure_rate: 407認証エラーを返すプロキシの割合
+            timeout_rate: 応答しないプロキシの割合
+            seed: 振る舞いを割り当てる乱数のシード
+        """
+        self.count = count
+        self.latency = latency
+        rng = random.Random(seed)
+        self.behaviors = []
+        for _ in range(count):
+            value = rng.random()
+            if value < timeout_rate:
+                self.behaviors.append(BEHAVIOR_TIMEOUT)
+            elif value < timeout_rate + auth_failure_rate:
+                self.behaviors.append(BEHAVIOR_AUTH)
+            elif value < timeout_rate + auth_failure_rate + failure_rate:
+                self.behaviors.append(BEHAVIOR_FAIL)
+            else:
+                self.behaviors.append(BEHAVIOR_OK)
+
+        self.proxies = []
+        self.test_urls = []
+        self._loop = None
+        self._thread = None
+        self._servers = []
+
+    def start(self):
+        """別スレッドのイベントループでエコーサーバーとプロキシを起動する"""
+        ready = threading.Event()
+
+        def run_loop():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self._start_servers())
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run_loop, daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    async def _start_servers(self):
+        echo = await ip_echo_server.start_server("127.0.0.1", 0)
+        self._servers.append(echo)
+        echo_port = echo.sockets[0].getsockname()[1]
+        # 厳密モードと同じく3つのテストURLでチェックする
+        self.test_urls = [
+            f"http://127.0.0.1:{echo_port}/ip",
+            f"http://127.0.0.1:{echo_port}/?format=json",
+            f"http://127.0.0.1:{echo_port}/json"
+        ]
+
+        for behavior in self.behaviors:
+            server = await asyncio.start_server(
+                lambda r, w, b=behavior: self._handle_proxy(r, w, b), "127.0.0.1", 0, backlog=1024
+            )
+            self._servers.append(server)
+            port = server.sockets[0].getsockname()[1]
+            if behavior == BEHAVIOR_AUTH:
+                self.proxies.append(f"127.0.0.1:{port}:user:pass")
+            else:
+                self.proxies.append(f"127.0.0.1:{port}")
+
+    async def _handle_proxy(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, behavior: str):
+        """プロキシへの1つの接続を処理する"""
+        try:
+            while True:
+                try:
+                    header = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+                if behavior == BEHAVIOR_TIMEOUT:
+                    # クライアントが諦めて切断するまで何も返さない
+                    await reader.read()
+                    break
+
+                await asyncio.sleep(self.latency)
+                if behavior == BEHAVIOR_AUTH:
+                    writer.write(b"HTTP/1.1 407 Proxy Authentication Required\r\n"
+                                 b"Proxy-Authenticate: Basic realm=\"bench\"\r\nContent-Length: 0\r\n\r\n")
+                elif behavior == BEHAVIOR_FAIL:
+                    writer.write(b"HTTP/1.1 502 Bad Gateway\r\nContent-Length: 0\r\n\r\n")
+                else:
+                    writer.write(await self._forward(header))
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            # 停止時のキャンセルも正常終了として扱う
+            pass
+        finally:
+            writer.close()
+
+    async def _forward(self, header: bytes) -> bytes:
+        """リクエストをエコーサーバーに転送し、Keep-Alive可能なレスポンスにして返す"""
+        method, target, _ = header.split(b"\r\n", 1)[0].decode('latin-1').split()
+        url = urlsplit(target)
+        path = url.path or "/"
+        if url.query:
+            path += "?" + url.query
+        upstream_reader, upstream_writer = await asyncio.open_connection(url.hostname, url.port or 80)
+        upstream_writer.write(f"{method} {path} HTTP/1.1\r\nHost: {url.netloc}\r\nConnection: close\r\n\r\n".encode('latin-1'))
+        data = await upstream_reader.read()
+        upstream_writer.close()
+        body = data.split(b"\r\n\r\n", 1)[1] if b"\r\n\r\n" in data else b""
+        return (b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                + f"Content-Length: {len(body)}\r\n\r\n".encode('ascii') + body)
+
+    def stop(self):
+        """すべてのサーバーを停止する"""
+        if not self._loop:
+            return
+
+        async def shutdown():
+            for server in self._servers:
+                server.close()
+            # 応答しないプロキシなどで残っている接続の処理を終了させる
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """パーセンタイル値（値がない場合は0）"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(percent / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def run_mode(farm: MockProxyFarm, mode: str, concurrency: int, timeout: float) -> Dict:
+    """
+    1つのモードでチェックと書き込みを実行して計測する
+
+    Args:
+        farm: 起動済みの偽プロキシ群
+        mode: "エンジン:書き込み方式"（例: "async:block"、書き込み方式は block / cell / stream）
+        concurrency: asyncエンジンの同時実行数
+        timeout: 1つのテストURLあたりのタイムアウト秒数
+
+    Returns:
+        計測結果
+    """
+    engine, write_mode = mode.split(':')
+    worksheet = InMemoryWorksheet([["プロキシ"]] + [[proxy] for proxy in farm.proxies])
+    checker = ProxyChecker("", "")
+    checker.worksheet = worksheet
+    # メモリ上のワークシートなので、Sheets APIの割り当てによる待機はしない
+    checker.api_scheduler = SheetsApiScheduler(read_per_minute=1e9, write_per_minute=1e9)
+    checker.test_urls = farm.test_urls
+    checker.timeout = timeout
+
+    # プロキシ1件ごとの所要時間を記録する
+    latencies = []
+    check_proxy_result = checker.check_proxy_result
+
+    def timed_check_proxy(proxy, **kwargs):
+        start = time.perf_counter()
+        try:
+            return check_proxy_result(proxy, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    checker.check_proxy_result = timed_check_proxy
+
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        checker.load_snapshot("A", "B", "C", "D", "E")
+        proxies = checker.read_proxies("A", 2)
+        if write_mode == "stream":
+            writer = StreamingResultWriter(checker)
+            writer.start()
+            results = checker.check_all_proxies(proxies, delay=0, engine=engine, concurrency=concurrency,
+                                                on_result=writer.add)
+            writer.close()
+        else:
+            results = checker.check_all_proxies(proxies, delay=0, engine=engine, concurrency=concurrency)
+            checker.write_results(results, write_mode=write_mode)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'mode': mode,
+        'proxies': len(results),
+        'valid': sum(1 for r in results if r.is_valid),
+        'seconds': round(elapsed, 3),
+        'proxies_per_sec': round(len(results) / elapsed, 2) if elapsed else 0.0,
+        'p50_latency': round(percentile(latencies, 50), 4),
+        'p95_latency': round(percentile(latencies, 95), 4),
+        'api_calls': worksheet.api_calls,
+        'api_calls_by_method': dict(worksheet.calls)
+    }
+
+
+def compare_with_baseline(reports: List[Dict], baseline: Dict, tolerance: float) -> List[str]:
+    """
+    基準値と比較して劣化している項目を返す
+
+    Args:
+        reports: 計測結果のリスト
+        baseline: モードをキーとする基準値
+        tolerance: 許容する劣化の割合（0.2 = 20%）
+
+    Returns:
+        劣化している項目の説明のリスト
+    """
+    regressions = []
+    for report in reports:
+        base = baseline.get(report['mode'])
+        if not base:
+            continue
+        if report['proxies_per_sec'] < base['proxies_per_sec'] * (1 - tolerance):
+            regressions.append(f"{report['mode']}: proxies/sec {report['proxies_per_sec']} < 基準値 {base['proxies_per_sec']}")
+        if report['p95_latency'] > base['p95_latency'] * (1 + tolerance):
+            regressions.append(f"{report['mode']}: p95 {report['p95_latency']}秒 > 基準値 {base['p95_latency']}秒")
+        if report['api_calls'] > base['api_calls']:
+            regressions.append(f"{report['mode']}: API呼び出し {report['api_calls']} > 基準値 {base['api_calls']}")
+    return regressions
+
+
+# 起動時間の計測で、GUIのウィンドウを表示した直後に終了するスクリプト
+GUI_READY_SCRIPT = """
+import tkinter as tk
+import proxy_checker_gui
+root = tk.Tk()
+proxy_checker_gui.ProxyCheckerGUI(root)
+root.update()
+root.destroy()
+"""
+
+# 起動時間の計測で、読み込まれていないことを確認するGoogleのライブラリ
+GOOGLE_MODULES = ('gspread', 'google')
+
+
+def startup_commands(farm: MockProxyFarm, workdir: str, timeout: float) -> Dict[str, List[str]]:
+    """
+    起動時間を計測するコマンド
+
+    Args:
+        farm: 起動済みの偽プロキシ群（ファイルでのチェックに使う）
+        workdir: 入出力ファイルを置くディレクトリ
+        timeout: 1つのテストURLあたりのタイムアウト秒数
+
+    Returns:
+        シナリオ名 -> コマンド（python以降の引数）
+    """
+    # 起動時間が目立つように、正常に応答するプロキシを少しだけチェックする
+    proxies = [proxy for proxy, behavior in zip(farm.proxies, farm.behaviors) if behavior == BEHAVIOR_OK][:10]
+    input_path = os.path.join(workdir, 'proxies.txt')
+    with open(input_path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(proxies) + "\n")
+    file_run = ['proxy_checker.py', '--input', input_path, '--output', os.path.join(workdir, 'results.jsonl'),
+                '--timeout', str(timeout)]
+    for url in farm.test_urls:
+        file_run.extend(['--test-url', url])
+    return {
+        'cli_help': ['proxy_checker.py', '--help'],
+        'file_run': file_run,
+        'gui_ready': ['-c', GUI_READY_SCRIPT]
+    }
+
+
+def run_startup(farm: MockProxyFarm, repeat: int, timeout: float) -> List[Dict]:
+    """
+    別プロセスで起動してから終了するまでの時間を計測する
+
+    - cli_help: python proxy_checker.py --help
+    - file_run: ファイルから読み込んでファイルに書き出すチェック（Googleのライブラリは読み込まない）
+    - gui_ready: GUIのウィンドウが表示されるまで（表示した直後に終了する）
+
+    Args:
+        farm: 起動済みの偽プロキシ群
+        repeat: シナリオごとの計測回数（中央値と最小値を求める）
+        timeout: 1つのテストURLあたりのタイムアウト秒数
+
+    Returns:
+        計測結果
+    """
+    import subprocess
+    import tempfile
+
+    repo_dir = os.path.dirname(os.path.abspath(__file__))
+    reports = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for scenario, command in startup_commands(farm, workdir, timeout).items():
+            report = {'mode': f'startup:{scenario}', 'seconds': None, 'min_seconds': None,
+                      'google_imported': None, 'skipped': None}
+            reports.append(report)
+
+            # 1回目は -X importtime で読み込んだモジュールを確認する（時間には含めない）
+            check = subprocess.run([sys.executable, '-X', 'importtime'] + command,
+                                   cwd=repo_dir, capture_output=True, text=True)
+            if check.returncode != 0:
+                # ディスプレイがない環境のGUIなど
+                lines = [line for line in check.stderr.splitlines() if not line.startswith('import time:')]
+                report['skipped'] = lines[-1] if lines else f"終了コード {check.returncode}"
+                continue
+            imported = {line.rsplit('|', 1)[-1].strip() for line in check.stderr.splitlines()
+                        if line.startswith('import time:')}
+            report['google_imported'] = any(name.split('.')[0] in GOOGLE_MODULES for name in imported)
+
+            seconds = []
+            for _ in range(max(1, repeat)):
+                start = time.perf_counter()
+                subprocess.run([sys.executable] + command, cwd=repo_dir, capture_output=True)
+                seconds.append(time.perf_counter() - start)
+            report['seconds'] = round(percentile(seconds, 50), 3)
+            report['min_seconds'] = round(min(seconds), 3)
+    return reports
+
+
+def compare_startup_with_baseline(reports: List[Dict], baseline: Dict, tolerance: float) -> List[str]:
+    """
+    起動時間を基準値と比較して劣化している項目を返す
+
+    Args:
+        reports: run_startupの計測結果
+        baseline: シナリオ（startup:...）をキーとする基準値
+        tolerance: 許容する劣化の割合（0.2 = 20%）
+
+    Returns:
+        劣化している項目の説明のリスト
+    """
+    regressions = []
+    for report in reports:
+        base = baseline.get(report['mode'])
+        if not base or report['skipped'] or base.get('skipped'):
+            continue
+        if report['seconds'] > base['seconds'] * (1 + tolerance):
+            regressions.append(f"{report['mode']}: {report['seconds']}秒 > 基準値 {base['seconds']}秒")
+        if report['google_imported'] and not base['google_imported']:
+            regressions.append(f"{report['mode']}: Googleのライブラリを読み込むようになりました")
+    return regressions
+
+
+def main():
+    """メイン関数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='プロキシチェックのベンチマーク（ローカルの偽プロキシを使用）')
+    parser.add_argument('--proxies', type=int, default=100,
+                       help='偽プロキシの数（デフォルト: 100）')
+    parser.add_argument('--latency', type=float, default=0.05,
+                       help='偽プロキシの応答遅延秒数（デフォルト: 0.05）')
+    parser.add_argument('--failure-rate', type=float, default=0.1,
+                       help='502エラーを返すプロキシの割合（デフォルト: 0.1）')
+    parser.add_argument('--auth-failure-rate', type=float, default=0.05,
+                       help='407認証エラーを返すプロキシの割合（デフォルト: 0.05）')
+    parser.add_argument('--timeout-rate', type=float, default=0.05,
+                       help='応答しないプロキシの割合（デフォルト: 0.05）')
+    parser.add_argument('--timeout', type=float, default=1.0,
+                       help='1つのテストURLあたりのタイムアウト秒数（デフォルト: 1.0）')
+    parser.add_argument('--concurrency', type=int, default=50,
+                       help='asyncエンジンの同時実行数（デフォルト: 50）')
+    parser.add_argument('--modes', default='serial:cell,async:block,async:stream',
+                       help='計測するモード（エンジン:書き込み方式 のカンマ区切り）')
+    parser.add_argument('--seed', type=int, default=1,
+                       help='偽プロキシの振る舞いを決める乱数のシード（デフォルト: 1）')
+    parser.add_argument('--baseline',
+                       help='比較する基準値ファイル（JSON）。劣化している場合は終了コード1')
+    parser.add_argument('--save-baseline', action='store_true',
+                       help='今回の結果を --baseline のファイルに保存する')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                       help='基準値に対して許容する劣化の割合（デフォルト: 0.2）')
+    parser.add_argument('--json', action='store_true',
+                       help='結果をJSONで出力する')
+    parser.add_argument('--startup', action='store_true',
+                       help='モードの代わりに起動時間（--help、ファイルでのチェック、GUIの表示）を計測する')
+    parser.add_argument('--repeat', type=int, default=5,
+                       help='起動時間の計測回数（デフォルト: 5）')
+    args = parser.parse_args()
+
+    farm = MockProxyFarm(args.proxies, args.latency, args.failure_rate,
+                         args.auth_failure_rate, args.timeout_rate, args.seed)
+    farm.start()
+    reports = []
+    try:
+        if args.startup:
+            if not args.json:
+                print("計測中: 起動時間 ...")
+            reports = run_startup(farm, args.repeat, args.timeout)
+        else:
+            for mode in args.modes.split(','):
+                if not args.json:
+                    print(f"計測中: {mode} ...")
+                reports.append(run_mode(farm, mode.strip(), args.concurrency, args.timeout))
+    finally:
+        farm.stop()
+
+    if args.json:
+        print(json.dumps(reports, ensure_ascii=False, indent=2))
+    elif args.startup:
+        print(f"\n{'シナリオ':<20}{'中央値(秒)':>10}{'最小(秒)':>10}  Googleライブラリ")
+        for r in reports:
+            if r['skipped']:
+                print(f"{r['mode']:<20}  スキップ: {r['skipped']}")
+                continue
+            print(f"{r['mode']:<20}{r['seconds']:>10}{r['min_seconds']:>10}  "
+                  f"{'読み込む' if r['google_imported'] else '読み込まない'}")
+    else:
+        print(f"\n{'モード':<16}{'件数':>6}{'有効':>6}{'秒':>9}{'件/秒':>9}{'p50(秒)':>10}{'p95(秒)':>10}{'API':>6}")
+        for r in reports:
+            print(f"{r['mode']:<16}{r['proxies']:>6}{r['valid']:>6}{r['seconds']:>9}{r['proxies_per_sec']:>9}"
+                  f"{r['p50_latency']:>10}{r['p95_latency']:>10}{r['api_calls']:>6}")
+
+    if not args.baseline:
+        return
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({r['mode']: r for r in reports}, f, ensure_ascii=False, indent=2)
+        print(f"\n基準値を保存しました: {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"エラー: 基準値ファイル '{args.baseline}' が見つかりません（--save-baseline で作成してください）")
+        sys.exit(1)
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    if args.startup:
+        regressions = compare_startup_with_baseline(reports, baseline, args.tolerance)
+    else:
+        regressions = compare_with_baseline(reports, baseline, args.tolerance)
+    if regressions:
+        print("\n⚠️  基準値より劣化しています:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        sys.exit(1)
+    print("\n基準値との比較: 問題なし")
+
+
+if __name__ == '__main__':
+    main()
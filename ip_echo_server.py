@@ -0,0 +1,149 @@
+"""
+IPエコーサーバー
+プロキシチェックのテストURLとして使用する、接続元のIPをJSONで返すサーバー
+httpbin.org / api.ipify.org / ip-api.com のレスポンス形式（origin, ip, query）に対応
+"""
+
+import asyncio
+import json
+import sys
+
+
+# リクエストヘッダーの上限（これを超える場合は接続を閉じる）
+MAX_HEADER_BYTES = 16 * 1024
+# リクエスト本文の上限（これを超える場合は413を返して接続を閉じる）
+MAX_BODY_BYTES = 1024 * 1024
+
+
+def build_response(client_ip: str, keep_alive: bool, head: bool = False) -> bytes:
+    """
+    接続元のIPを返すHTTPレスポンスを作成
+    
+    Args:
+        client_ip: 接続元のIP（プロキシ経由の場合はプロキシの出口IP）
+        keep_alive: 接続を維持するかどうか
+        head: HEADリクエストの場合は本文を付けない
+    
+    Returns:
+        HTTPレスポンスのバイト列
+    """
+    body = json.dumps({"origin": client_ip, "ip": client_ip, "query": client_ip}).encode('utf-8')
+    headers = [
+        "HTTP/1.1 200 OK",
+        "Content-Type: application/json",
+        f"Content-Length: {len(body)}",
+        "Cache-Control: no-store",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    response = ("\r\n".join(headers) + "\r\n\r\n").encode('ascii')
+    return response if head else response + body
+
+
+def error_response(status: str) -> bytes:
+    """本文なしで接続を閉じるエラーレスポンスを作成（例: "400 Bad Request"）"""
+    return f"HTTP/1.1 {status}\r\nContent-Length: 0\r\nConnection: close\r\n\r\n".encode('ascii')
+
+
+async def handle_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """1つの接続を処理する（Keep-Aliveで複数のリクエストに対応）"""
+    peer = writer.get_extra_info('peername')
+    client_ip = peer[0] if peer else ""
+    try:
+        while True:
+            try:
+                header = await reader.readuntil(b"\r\n\r\n")
+            except asyncio.LimitOverrunError:
+                break
+            except asyncio.IncompleteReadError:
+                break
+            
+            lines = header.decode('latin-1').split("\r\n")
+            request_line = lines[0].split()
+            if len(request_line) != 3:
+                writer.write(error_response("400 Bad Request"))
+                break
+            method, _, version = request_line
+            
+            headers = {}
+            for line in lines[1:]:
+                if ':' in line:
+                    name, value = line.split(':', 1)
+                    headers[name.strip().lower()] = value.strip()
+            
+            # リクエスト本文は使わないが、Keep-Aliveのために読み捨てる
+            # （数字以外や負の値は不正なリクエスト、大きすぎる本文は読まずに接続を閉じる）
+            content_length = headers.get('content-length') or '0'
+            if not (content_length.isascii() and content_length.isdigit()):
+                writer.write(error_response("400 Bad Request"))
+                break
+            content_length = int(content_length)
+            if content_length > MAX_BODY_BYTES:
+                writer.write(error_response("413 Payload Too Large"))
+                break
+            if content_length:
+                await reader.readexactly(content_length)
+            
+            connection = headers.get('connection', '').lower()
+            keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+            
+            writer.write(build_response(client_ip, keep_alive, head=(method == 'HEAD')))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+        # サーバー停止時のキャンセルも正常終了として扱う
+        pass
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def start_server(host: str = "0.0.0.0", port: int = 8080) -> asyncio.AbstractServer:
+    """
+    IPエコーサーバーを開始する
+    
+    Args:
+        host: 待ち受けるアドレス
+        port: 待ち受けるポート（0の場合は空いているポート）
+    
+    Returns:
+        開始したサーバー
+    """
+    return await asyncio.start_server(
+        handle_client, host, port, limit=MAX_HEADER_BYTES, backlog=4096
+    )
+
+
+async def serve(host: str, port: int):
+    """サーバーを開始して停止されるまで待つ"""
+    server = await start_server(host, port)
+    addresses = ", ".join(f"{sock.getsockname()[0]}:{sock.getsockname()[1]}" for sock in server.sockets)
+    print(f"IPエコーサーバーを開始しました: {addresses}")
+    print(f"テストURLの例: http://<このサーバーのアドレス>:{port}/ip")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    """メイン関数"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='IPエコーサーバー（プロキシチェックのテストURL用）')
+    parser.add_argument('--host', default='0.0.0.0',
+                       help='待ち受けるアドレス（デフォルト: 0.0.0.0）')
+    parser.add_argument('--port', '-p', type=int, default=8080,
+                       help='待ち受けるポート（デフォルト: 8080）')
+    args = parser.parse_args()
+    
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\nIPエコーサーバーを停止しました")
+        sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+"""
+接続の各段階（名前解決・TCP接続・プロキシCONNECT・TLS）の所要時間を記録するHTTPAdapter
+requestsとurllib3を読み込むため、プロキシのチェックを始めるときに初めて読み込む
+"""
+
+import socket
+import threading
+import time
+
+import urllib3
+from requests.adapters import HTTPAdapter
+
+# プロキシ経由のチェックはverify=Falseで行うため、警告はまとめて無効化しておく
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+
+# テスト中のスレッドで、接続の各段階の所要時間（秒）を記録する辞書（phase_timings.timings）と、
+# そのテストを中断するためのProbeCancellation（phase_timings.cancellation）
+phase_timings = threading.local()
+
+
+class ProbeCancellation:
+    """
+    実行中のテストが使っている接続を別のスレッドから閉じて、テストを中断する
+    
+    テスト中に使ったソケットを登録しておき、cancelでshutdownする。
+    プロキシへのTCP接続中（ソケットが返される前）は中断できず、接続のタイムアウトまで続く。
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sockets = set()
+        self._finished = False
+        self.cancelled = False
+    
+    def register(self, sock: socket.socket):
+        """テストで使うソケットを登録（中断済みの場合はすぐに閉じる）"""
+        with self._lock:
+            if self._finished:
+                return
+            if not self.cancelled:
+                self._sockets.add(sock)
+                return
+        _shutdown(sock)
+    
+    def cancel(self):
+        """登録されたソケットを閉じてテストを中断する（テストが終わっている場合は何もしない）"""
+        with self._lock:
+            if self._finished:
+                return
+            self.cancelled = True
+            sockets = list(self._sockets)
+            self._sockets.clear()
+        for sock in sockets:
+            _shutdown(sock)
+    
+    def finish(self):
+        """テストの終了時に呼ぶ（以降のcancelでは、Keep-Aliveでプールに戻した接続を閉じない）"""
+        with self._lock:
+            self._finished = True
+            self._sockets.clear()
+
+
+def _shutdown(sock: socket.socket):
+    # closeでは別のスレッドで待っている読み込みが終わらないため、shutdownで接続を切る
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+def _register_socket(sock):
+    cancellation = getattr(phase_timings, 'cancellation', None)
+    if cancellation is not None and sock is not None:
+        cancellation.register(sock)
+
+
+class _PhaseTimingMixin:
+    """
+    urllib3の接続クラスに、名前解決・TCP接続・プロキシCONNECT・TLSの所要時間の記録を追加する
+    
+    phase_timings.timingsが設定されているスレッドでのみ記録する。
+    Keep-Aliveで再利用された接続では接続確立が行われないため、記録されない。
+    """
+    
+    def _new_conn(self):
+        sock = self._new_timed_conn()
+        # プロキシCONNECTとTLSハンドシェイクはこのソケットで行うため、ここから中断できる
+        _register_socket(sock)
+        return sock
+    
+    def _new_timed_conn(self):
+        timings = getattr(phase_timings, 'timings', None)
+        if timings is None:
+            return super()._new_conn()
+        
+        # 名前解決を先に行い、解決したIPに接続させることでDNSとTCP接続を分けて計測する
+        host = self._dns_host
+        start = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(host, self.port, urllib3.util.connection.allowed_gai_family(),
+                                           socket.SOCK_STREAM)
+        except OSError:
+            # 名前解決のエラーはurllib3と同じ例外にするため、そのまま任せる
+            return super()._new_conn()
+        timings['dns'] = time.perf_counter() - start
+        
+        # urllib3と同じく、解決したアドレスを順に試す（IPv6に接続できない場合にIPv4を試すなど）
+        last_error = None
+        try:
+            for address in addresses:
+                self._dns_host = address[4][0]
+                attempt_start = time.perf_counter()
+                try:
+                    sock = super()._new_conn()
+                except urllib3.exceptions.ConnectTimeoutError as e:
+                    # NewConnectionErrorも含む
+                    last_error = e
+                    continue
+                timings['connect'] = time.perf_counter() - attempt_start
+                return sock
+        finally:
+            self._dns_host = host
+        if last_error is None:
+            return super()._new_conn()
+        raise last_error
+    
+    def _tunnel(self):
+        timings = getattr(phase_timings, 'timings', None)
+        start = time.perf_counter()
+        super()._tunnel()
+        if timings is not None:
+            timings['proxy_connect'] = time.perf_counter() - start
+    
+    def getresponse(self, *args, **kwargs):
+        # Keep-Aliveで再利用した接続は_new_connを通らないため、応答を待つ前に登録する
+        _register_socket(self.sock)
+        return super().getresponse(*args, **kwargs)
+    
+    def connect(self):
+        timings = getattr(phase_timings, 'timings', None)
+        start = time.perf_counter()
+        super().connect()
+        if timings is not None and isinstance(self, urllib3.connection.HTTPSConnection):
+            # TLSハンドシェイクは接続全体から他の段階を引いた時間
+            elapsed = time.perf_counter() - start
+            timings['tls'] = max(0.0, elapsed - sum(timings.get(phase, 0.0) for phase in ('dns', 'connect', 'proxy_connect')))
+
+
+class _TimedHTTPConnection(_PhaseTimingMixin, urllib3.connection.HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_PhaseTimingMixin, urllib3.connection.HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(urllib3.HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(urllib3.HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+_TIMED_POOL_CLASSES = {
+    'http': _TimedHTTPConnectionPool,
+    'https': _TimedHTTPSConnectionPool
+}
+
+
+class PhaseTimingAdapter(HTTPAdapter):
+    """接続の各段階の所要時間を記録する接続クラスを使うHTTPAdapter"""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = _TIMED_POOL_CLASSES
+    
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+        # SOCKSプロキシは専用の接続クラスを使うため変更しない
+        if not proxy.lower().startswith('socks'):
+            manager.pool_classes_by_scheme = _TIMED_POOL_CLASSES
+        return manager
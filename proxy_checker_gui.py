@@ -7,7 +7,6 @@ from tkinter import ttk, filedialog, messagebox, scrolledtext
 import threading
 import sys
 import os
-from proxy_checker import ProxyChecker
 
 
 class ProxyCheckerGUI:
@@ -31,6 +30,7 @@ class ProxyCheckerGUI:
         self.delay = tk.DoubleVar(value=1.0)
         self.strict_mode = tk.BooleanVar(value=True)
         self.track_changes = tk.BooleanVar(value=True)
+        self.short_message = tk.BooleanVar(value=False)
         
         self.is_running = False
         self.checker = None
@@ -89,9 +89,12 @@ class ProxyCheckerGUI:
         # 変更追跡
         ttk.Checkbutton(settings_frame, text="変更追跡（無効になったプロキシを検出）", variable=self.track_changes).grid(row=7, column=0, columnspan=3, sticky=tk.W, pady=5)
         
+        # メッセージの形式
+        ttk.Checkbutton(settings_frame, text="短いメッセージ（判定・成功数・平均応答時間のみ）", variable=self.short_message).grid(row=8, column=0, columnspan=3, sticky=tk.W, pady=5)
+        
         # 列設定（詳細）
         columns_detail_frame = ttk.LabelFrame(settings_frame, text="列設定（詳細）", padding="5")
-        columns_detail_frame.grid(row=8, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=5)
+        columns_detail_frame.grid(row=9, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=5)
         
         ttk.Label(columns_detail_frame, text="チェック日時列:").grid(row=0, column=0, padx=5)
         ttk.Entry(columns_detail_frame, textvariable=self.date_column, width=5).grid(row=0, column=1, padx=5)
@@ -178,12 +181,16 @@ class ProxyCheckerGUI:
         try:
             self.log("=== プロキシチェックツール ===\n")
             
+            # ウィンドウをすぐに表示するため、チェック処理のモジュールは最初のチェックの開始時に読み込む
+            from proxy_checker import ProxyChecker, StreamingResultWriter
+            
             # ProxyCheckerのインスタンスを作成
             self.checker = ProxyChecker(
                 credentials_file=self.credentials_file.get(),
                 spreadsheet_key=self.spreadsheet_key.get(),
                 worksheet_name=self.worksheet_name.get()
             )
+            self.checker.message_format = "short" if self.short_message.get() else "verbose"
             
             # スプレッドシートに接続
             self.log("スプレッドシートに接続中...")
@@ -194,6 +201,13 @@ class ProxyCheckerGUI:
             # プロキシを読み込む
             self.log("プロキシを読み込み中...")
             self.progress_var.set("プロキシを読み込み中...")
+            self.checker.load_snapshot(
+                self.proxy_column.get(),
+                self.status_column.get(),
+                self.message_column.get(),
+                self.date_column.get(),
+                self.previous_status_column.get()
+            )
             proxies = self.checker.read_proxies(
                 proxy_column=self.proxy_column.get(),
                 start_row=self.start_row.get()
@@ -210,49 +224,48 @@ class ProxyCheckerGUI:
             self.log("プロキシチェックを開始します...\n")
             self.progress_var.set(f"プロキシをチェック中... (0/{len(proxies)})")
             
+            # チェックしながら結果を順次スプレッドシートに書き込む
+            writer = StreamingResultWriter(
+                self.checker,
+                status_column=self.status_column.get(),
+                message_column=self.message_column.get(),
+                date_column=self.date_column.get(),
+                previous_status_column=self.previous_status_column.get(),
+                start_row=self.start_row.get(),
+                track_changes=self.track_changes.get(),
+                proxy_column=self.proxy_column.get()
+            )
+            writer.start()
+            
             # カスタムチェック関数（進捗表示付き）
             results = []
             total = len(proxies)
             
-            for i, proxy in enumerate(proxies, 1):
-                if not self.is_running:  # キャンセルチェック
-                    break
-                
-                self.progress_var.set(f"プロキシをチェック中... ({i}/{total})")
-                self.log(f"[{i}/{total}] チェック中: {proxy}")
-                
-                is_valid, message = self.checker.check_proxy(proxy, strict=self.strict_mode.get())
-                status = "有効" if is_valid else "無効"
-                
-                result = {
-                    "proxy": proxy,
-                    "status": status,
-                    "message": message,
-                    "is_valid": is_valid
-                }
-                results.append(result)
-                
-                self.log(f"  結果: {status} - {message}")
-                
-                if i < total:
-                    import time
-                    time.sleep(self.delay.get())
-            
-            # 結果を書き込む
-            if self.is_running and results:
+            try:
+                for i, proxy in enumerate(proxies, 1):
+                    if not self.is_running:  # キャンセルチェック
+                        break
+                    
+                    self.progress_var.set(f"プロキシをチェック中... ({i}/{total})")
+                    self.log(f"[{i}/{total}] チェック中: {proxy}")
+                    
+                    result = self.checker.check_proxy_result(proxy, strict=self.strict_mode.get())
+                    results.append(result)
+                    writer.add(i - 1, result)
+                    
+                    self.log(f"  結果: {result.status} - {self.checker.render_message(result)}")
+                    
+                    if i < total:
+                        import time
+                        time.sleep(self.delay.get())
+            finally:
+                # 残りの結果を書き込む
                 self.log(f"\n結果をスプレッドシートに書き込んでいます...")
                 self.progress_var.set("結果を書き込み中...")
-                changed_proxies = self.checker.write_results(
-                    results,
-                    status_column=self.status_column.get(),
-                    message_column=self.message_column.get(),
-                    date_column=self.date_column.get(),
-                    previous_status_column=self.previous_status_column.get(),
-                    start_row=self.start_row.get(),
-                    track_changes=self.track_changes.get()
-                )
-                
-                valid_count = sum(1 for r in results if r['is_valid'])
+                changed_proxies = writer.close()
+            
+            if self.is_running and results:
+                valid_count = sum(1 for r in results if r.is_valid)
                 invalid_count = len(results) - valid_count
                 
                 self.log(f"\n=== チェック完了 ===")
@@ -303,7 +316,8 @@ class ProxyCheckerGUI:
                 "start_row": self.start_row.get(),
                 "delay": self.delay.get(),
                 "strict": self.strict_mode.get(),
-                "track_changes": self.track_changes.get()
+                "track_changes": self.track_changes.get(),
+                "message_format": "short" if self.short_message.get() else "verbose"
             }
             
             filename = filedialog.asksaveasfilename(
@@ -337,6 +351,7 @@ class ProxyCheckerGUI:
                 self.message_column.set(config.get('message_column', 'C'))
                 self.start_row.set(config.get('start_row', 2))
                 self.delay.set(config.get('delay', 1.0))
+                self.short_message.set(config.get('message_format', 'verbose') == 'short')
                 
                 self.log(f"設定を読み込みました: {config_file}")
             except Exception as e:
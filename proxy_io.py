@@ -0,0 +1,472 @@
+"""
+ファイル・標準入出力からのプロキシの読み込みと結果の書き出し
+スプレッドシートの代わりに、CSV / JSONL / テキストファイル（"-" の場合は標準入力・標準出力）を使う
+
+読み込み元（ProxySource）はプロキシを1件ずつ返すイテレーター、
+書き出し先（ResultSink）は StreamingResultWriter と同じ start / add / flush / close を持つオブジェクト。
+スプレッドシートは SheetSource と StreamingResultWriter がそれぞれの実装になる。
+run_pipelineは、読み込んだが書き出していないプロキシが一定件数を超えないように読み込みながらチェックするため、
+プロキシが何百万件あってもメモリの使用量は一定件数分で済む。
+asyncエンジンでは結果が出るたびに次のプロキシを読み込む（遅いプロキシがあっても他のチェックは止まらない）。
+"""
+
+import contextlib
+import csv
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from itertools import islice
+from typing import Iterator, List, Optional, TextIO
+
+# 読み込み・書き出しに対応している形式
+FORMATS = ('text', 'csv', 'jsonl')
+
+
+def guess_format(path: str) -> str:
+    """
+    ファイルの拡張子から形式を推測（"-"や不明な拡張子の場合は "text"）
+    
+    Args:
+        path: ファイルのパス
+    
+    Returns:
+        "text", "csv", "jsonl" のいずれか
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return 'csv'
+    if extension in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    return 'text'
+
+
+class ProxySource:
+    """プロキシの読み込み元（イテレーターとしてプロキシを1件ずつ返す）"""
+    
+    def __iter__(self) -> Iterator[str]:
+        raise NotImplementedError
+    
+    def close(self):
+        """読み込み元を閉じる"""
+        pass
+
+
+class FileSource(ProxySource):
+    """
+    ファイル（"-" の場合は標準入力）からプロキシを1行ずつ読み込む
+    
+    空行は読み飛ばす。形式ごとの行の解釈はparse_lineで行う。
+    """
+    
+    def __init__(self, path: str):
+        """
+        初期化
+        
+        Args:
+            path: ファイルのパス（"-" の場合は標準入力）
+        """
+        self.path = path
+        self._file = sys.stdin if path == '-' else open(path, 'r', encoding='utf-8', newline='')
+    
+    def __iter__(self) -> Iterator[str]:
+        for line in self._file:
+            line = line.strip()
+            if not line:
+                continue
+            proxy = self.parse_line(line)
+            if proxy:
+                yield proxy
+    
+    def parse_line(self, line: str) -> Optional[str]:
+        """1行からプロキシを取り出す（取り出せない行はNone）"""
+        raise NotImplementedError
+    
+    def close(self):
+        if self._file is not sys.stdin:
+            self._file.close()
+
+
+class TextSource(FileSource):
+    """1行に1つのプロキシを書いたテキスト（# で始まる行はコメント）"""
+    
+    def parse_line(self, line: str) -> Optional[str]:
+        return None if line.startswith('#') else line
+
+
+class JsonlSource(FileSource):
+    """
+    1行に1つのJSONを書いたファイル
+    
+    オブジェクトの場合はcolumnのキーの値を、文字列の場合はその文字列をプロキシとする。
+    """
+    
+    def __init__(self, path: str, column: str = "proxy"):
+        """
+        初期化
+        
+        Args:
+            path: ファイルのパス（"-" の場合は標準入力）
+            column: プロキシが入っているキー
+        """
+        super().__init__(path)
+        self.column = column
+    
+    def parse_line(self, line: str) -> Optional[str]:
+        try:
+            data = json.loads(line)
+        except ValueError:
+            print(f"JSONとして読み込めない行を読み飛ばしました: {line[:50]}")
+            return None
+        if isinstance(data, dict):
+            data = data.get(self.column)
+        return str(data).strip() if data else None
+
+
+class CsvSource(ProxySource):
+    """
+    CSVファイル
+    
+    1行目にcolumnと同じ名前の列があれば、それをヘッダーとしてその列を読み込む。
+    ない場合は1行目からデータとして、1列目を読み込む。
+    """
+    
+    def __init__(self, path: str, column: str = "proxy"):
+        """
+        初期化
+        
+        Args:
+            path: ファイルのパス（"-" の場合は標準入力）
+            column: プロキシが入っている列の名前（ヘッダー）
+        """
+        self.path = path
+        self.column = column
+        self._file = sys.stdin if path == '-' else open(path, 'r', encoding='utf-8', newline='')
+    
+    def __iter__(self) -> Iterator[str]:
+        reader = csv.reader(self._file)
+        index = 0
+        first = True
+        for row in reader:
+            if first:
+                first = False
+                if self.column in row:
+                    index = row.index(self.column)
+                    continue
+            if len(row) > index and row[index].strip():
+                yield row[index].strip()
+    
+    def close(self):
+        if self._file is not sys.stdin:
+            self._file.close()
+
+
+class SheetSource(ProxySource):
+    """
+    スプレッドシートのプロキシ列
+    
+    列全体を一度に取得せず、page_size行ずつの範囲（例: A2:A1001）を取得しながら返す。
+    ワークシートの行数（row_count）がわかる場合はその行まで、わからない場合は
+    途中で値が終わったページまで読み込む。checker.snapshotがこの列を含む場合はそれを使い、APIを呼ばない。
+    """
+    
+    def __init__(self, checker, proxy_column: str = "A", start_row: int = 2, page_size: int = 1000):
+        """
+        初期化
+        
+        Args:
+            checker: スプレッドシートに接続済みのProxyChecker
+            proxy_column: プロキシ列
+            start_row: データが開始する行番号
+            page_size: 1回のAPI呼び出しで取得する行数
+        """
+        self.checker = checker
+        self.proxy_column = proxy_column
+        self.start_row = start_row
+        self.page_size = max(1, page_size)
+    
+    def __iter__(self) -> Iterator[str]:
+        snapshot = self.checker.snapshot
+        if snapshot is not None and snapshot.covers(self.proxy_column):
+            for value in snapshot.col_values(self.proxy_column)[self.start_row - 1:]:
+                if value.strip():
+                    yield value.strip()
+            return
+        
+        worksheet = self.checker.worksheet
+        last_row = getattr(worksheet, 'row_count', None)
+        column = self.proxy_column.upper()
+        row = self.start_row
+        while last_row is None or row <= last_row:
+            end = row + self.page_size - 1 if last_row is None else min(row + self.page_size - 1, last_row)
+            values = self.checker._api_call("read", "get", worksheet.get, f"{column}{row}:{column}{end}")
+            for values_row in values:
+                if values_row and str(values_row[0]).strip():
+                    yield str(values_row[0]).strip()
+            if last_row is None and len(values) < end - row + 1:
+                break
+            row = end + 1
+
+
+def open_source(path: str, format: Optional[str] = None, column: str = "proxy") -> ProxySource:
+    """
+    ファイルの読み込み元を作成
+    
+    Args:
+        path: ファイルのパス（"-" の場合は標準入力）
+        format: 形式（"text", "csv", "jsonl"。Noneの場合は拡張子から推測）
+        column: CSVの列名・JSONLのキー
+    
+    Returns:
+        読み込み元
+    """
+    format = format or guess_format(path)
+    if format == 'csv':
+        return CsvSource(path, column)
+    if format == 'jsonl':
+        return JsonlSource(path, column)
+    if format == 'text':
+        return TextSource(path)
+    raise ValueError(f"不明な形式です: {format}")
+
+
+class FileSink:
+    """
+    結果をファイル（"-" の場合は標準出力）に1件ずつ書き出す
+    
+    StreamingResultWriterと同じ start / add / flush / close を持つ。
+    結果はaddされた順に書き出す（run_pipelineは読み込んだ順にaddする）。
+    """
+    
+    def __init__(self, checker, path: str):
+        """
+        初期化
+        
+        Args:
+            checker: メッセージの形式（message_format）に使うProxyChecker
+            path: ファイルのパス（"-" の場合は標準出力）
+        """
+        self.checker = checker
+        self.path = path
+        self.count = 0
+        self.valid_count = 0
+        # 標準出力は作成した時点のもの（run_pipelineが進捗表示を標準エラーに切り替える前のもの）に書き出す
+        self._stdout = sys.stdout
+        self._file: Optional[TextIO] = None
+    
+    @property
+    def writes_stdout(self) -> bool:
+        """標準出力に書き出すかどうか"""
+        return self.path == '-'
+    
+    def start(self):
+        """書き出し先を開く"""
+        self._file = self._stdout if self.writes_stdout else open(self.path, 'w', encoding='utf-8', newline='')
+        self.write_header()
+    
+    def write_header(self):
+        pass
+    
+    def add(self, index: int, result):
+        """
+        1件の結果を書き出す
+        
+        Args:
+            index: 読み込み元でのインデックス
+            result: チェック結果（CheckResult）
+        """
+        self.write_result(result, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        self.count += 1
+        if result.is_valid:
+            self.valid_count += 1
+    
+    def write_result(self, result, checked_at: str):
+        raise NotImplementedError
+    
+    def flush(self):
+        """書き出した結果をファイルに反映する"""
+        self._file.flush()
+    
+    def close(self) -> List[str]:
+        """
+        書き出し先を閉じる
+        
+        Returns:
+            前回有効→今回無効になったプロキシのリスト（ファイルでは追跡しないため常に空）
+        """
+        if self._file is None:
+            return []
+        if self.writes_stdout:
+            self._file.flush()
+        else:
+            self._file.close()
+        self._file = None
+        print(f"\n結果を書き出しました: 有効 {self.valid_count}/{self.count}（{self.path}）")
+        return []
+
+
+class TextSink(FileSink):
+    """「プロキシ<TAB>ステータス<TAB>メッセージ」の行を書き出す"""
+    
+    def write_result(self, result, checked_at: str):
+        message = self.checker.render_message(result).replace('\t', ' ').replace('\n', ' ')
+        self._file.write(f"{result.proxy}\t{result.status}\t{message}\n")
+
+
+class CsvSink(FileSink):
+    """proxy, status, message, checked_at, connect_ms, ttfb_ms の列のCSVを書き出す"""
+    
+    HEADER = ['proxy', 'status', 'message', 'checked_at', 'connect_ms', 'ttfb_ms']
+    
+    def write_header(self):
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.HEADER)
+    
+    def write_result(self, result, checked_at: str):
+        self._writer.writerow([
+            result.proxy, result.status, self.checker.render_message(result), checked_at,
+            result.connect_ms if result.connect_ms is not None else "",
+            result.ttfb_ms if result.ttfb_ms is not None else ""
+        ])
+
+
+class JsonlSink(FileSink):
+    """1件の結果を1行のJSONで書き出す"""
+    
+    def write_result(self, result, checked_at: str):
+        entry = {
+            'proxy': result.proxy,
+            'status': result.status,
+            'is_valid': result.is_valid,
+            'message': self.checker.render_message(result),
+            'checked_at': checked_at,
+            'connect_ms': result.connect_ms,
+            'ttfb_ms': result.ttfb_ms
+        }
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def open_sink(checker, path: str, format: Optional[str] = None) -> FileSink:
+    """
+    ファイルの書き出し先を作成
+    
+    Args:
+        checker: メッセージの形式（message_format）に使うProxyChecker
+        path: ファイルのパス（"-" の場合は標準出力）
+        format: 形式（"text", "csv", "jsonl"。Noneの場合は拡張子から推測）
+    
+    Returns:
+        書き出し先
+    """
+    format = format or guess_format(path)
+    if format == 'csv':
+        return CsvSink(checker, path)
+    if format == 'jsonl':
+        return JsonlSink(checker, path)
+    if format == 'text':
+        return TextSink(checker, path)
+    raise ValueError(f"不明な形式です: {format}")
+
+
+def run_pipeline(checker, source: ProxySource, sink, chunk_size: int = 1000, delay: float = 1.0,
+                 strict: bool = True, engine: Optional[str] = None, concurrency: Optional[int] = None,
+                 prefilter: bool = False, prefilter_timeout: float = 2.0) -> List[str]:
+    """
+    読み込み元からプロキシを読み込みながらチェックし、結果を書き出し先に書き出す
+    
+    asyncエンジンでは、読み込んだが書き出していないプロキシがchunk_size件を超えないように、
+    結果を書き出すたびに次のプロキシを読み込んでチェックを始める（ProxyChecker.check_proxies_stream）。
+    serial・distributedエンジンでは、chunk_size件ずつ読み込んでチェックし、書き出してから次を読み込む。
+    どちらもメモリに持つのはchunk_size件分だけで、書き出し先はchunk_size件ごとにflushする。
+    結果は読み込んだ順に書き出す（チェックしなかったプロキシは書き出さない）。
+    書き出し先が標準出力の場合、進捗表示は標準エラーに出力する。
+    checker.stop_requestedが設定されると、実行中のチェックの完了を待って終了する。
+    
+    Args:
+        checker: チェックに使うProxyChecker
+        source: 読み込み元（プロキシを1件ずつ返すイテレーター）
+        sink: 書き出し先（start / add / flush / close を持つもの）
+        chunk_size: 読み込んだが書き出していないプロキシ数の上限（serial・distributedエンジンでは1回にチェックするプロキシ数）
+        delay: チェック間の遅延（秒、serialエンジンのみ）
+        strict: 厳密モード（複数URLでテスト、IP一致確認など）
+        engine: チェックエンジン（"serial", "async", "distributed"、Noneの場合はchecker.DEFAULT_ENGINE）
+        concurrency: 同時にチェックするプロキシ数の上限（asyncエンジンのみ、Noneの場合はchecker.DEFAULT_CONCURRENCY）
+        prefilter: 事前にTCP接続だけを試し、接続できないプロキシはHTTPチェックせずに無効とする
+        prefilter_timeout: 事前チェックのTCP接続タイムアウト（秒）
+    
+    Returns:
+        前回有効→今回無効になったプロキシのリスト（書き出し先が追跡する場合）
+    """
+    engine = engine or checker.DEFAULT_ENGINE
+    concurrency = concurrency if concurrency is not None else checker.DEFAULT_CONCURRENCY
+    if getattr(sink, 'writes_stdout', False):
+        with contextlib.redirect_stdout(sys.stderr):
+            return _run_pipeline(checker, source, sink, chunk_size, delay, strict, engine, concurrency,
+                                 prefilter, prefilter_timeout)
+    return _run_pipeline(checker, source, sink, chunk_size, delay, strict, engine, concurrency,
+                         prefilter, prefilter_timeout)
+
+
+def _run_pipeline(checker, source: ProxySource, sink, chunk_size: int, delay: float, strict: bool,
+                  engine: str, concurrency: int, prefilter: bool, prefilter_timeout: float) -> List[str]:
+    print("=== プロキシチェックツール ===\n")
+    started_at = time.perf_counter()
+    chunk_size = max(1, chunk_size)
+    # チェックの集計（serial・distributedエンジンではチャンクごとのcheck_all_proxiesのstatsを合計する）
+    totals = {}
+    offset = 0
+    valid_count = 0
+    checked_count = 0
+    
+    proxies_iter = iter(source)
+    sink.start()
+    try:
+        if engine == "async":
+            results = checker.check_proxies_stream(proxies_iter, strict, concurrency, window=chunk_size,
+                                                   prefilter=prefilter, prefilter_timeout=prefilter_timeout)
+            try:
+                for index, result in results:
+                    offset = index + 1
+                    if result is None:
+                        continue
+                    sink.add(index, result)
+                    checked_count += 1
+                    if result.is_valid:
+                        valid_count += 1
+                    if checked_count % chunk_size == 0:
+                        sink.flush()
+            finally:
+                results.close()
+            sink.flush()
+            totals = dict(checker.stats)
+        else:
+            while not checker.stop_requested.is_set():
+                chunk = list(islice(proxies_iter, chunk_size))
+                if not chunk:
+                    break
+                results = checker.check_all_proxies(chunk, delay, strict, engine, concurrency,
+                                                    prefilter=prefilter, prefilter_timeout=prefilter_timeout)
+                for i, result in enumerate(results):
+                    if result is None:
+                        continue
+                    sink.add(offset + i, result)
+                    checked_count += 1
+                    if result.is_valid:
+                        valid_count += 1
+                sink.flush()
+                offset += len(chunk)
+                for key, value in checker.stats.items():
+                    totals[key] = totals.get(key, 0) + value
+    finally:
+        changed_proxies = sink.close()
+        source.close()
+    
+    if offset > checked_count + totals.get('not_due', 0):
+        print(f"\n停止: 読み込んだ{offset}個のうち{offset - checked_count - totals.get('not_due', 0)}個はチェックしていません")
+    checker.stats = totals
+    checker.print_summary(valid_count, checked_count)
+    
+    if checker.metrics is not None:
+        checker.metrics.record_run(time.perf_counter() - started_at)
+    return changed_proxies
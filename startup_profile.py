@@ -0,0 +1,73 @@
+"""
+起動時間の計測（--startup-profile）
+モジュールの読み込み（import）ごとの所要時間を記録し、終了時に内訳を標準エラー出力に表示する
+"""
+
+import atexit
+import builtins
+import sys
+import threading
+import time
+
+# install()を呼んだ時刻（表示する時刻はここからの経過秒数）
+_started_at = time.perf_counter()
+# (開始時刻, 所要秒数, モジュール名, 入れ子の深さ)
+_records = []
+# (時刻, ラベル)
+_marks = []
+_state = threading.local()
+_original_import = None
+
+
+def install():
+    """builtins.__import__を置き換えて記録を始め、終了時に内訳を表示する"""
+    global _original_import, _started_at
+    if _original_import is not None:
+        return
+    _started_at = time.perf_counter()
+    _original_import = builtins.__import__
+    builtins.__import__ = _timed_import
+    atexit.register(report)
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    # 読み込み済みのモジュールと相対インポートは記録しない
+    if level or name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+    depth = getattr(_state, 'depth', 0)
+    _state.depth = depth + 1
+    start = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        _state.depth = depth
+        _records.append((start - _started_at, time.perf_counter() - start, name, depth))
+
+
+def mark(label: str):
+    """現在の時刻をラベル付きで記録（内訳に表示する）"""
+    _marks.append((time.perf_counter() - _started_at, label))
+
+
+def report(top: int = 20):
+    """
+    記録した内訳を標準エラー出力に表示
+    
+    直接読み込んだモジュールごとに、そのモジュールが読み込んだモジュールも含めた所要時間を、
+    長い順に表示する。
+    
+    Args:
+        top: 表示するモジュールの数
+    """
+    out = sys.stderr
+    roots = [record for record in _records if record[3] == 0]
+    print("\n=== 起動時間の内訳（--startup-profile） ===", file=out)
+    print(f"経過時間: {time.perf_counter() - _started_at:.3f}秒", file=out)
+    print(f"モジュールの読み込み: {sum(r[1] for r in roots):.3f}秒（{len(_records)}個）", file=out)
+    for at, label in _marks:
+        print(f"  {at:8.3f}秒  {label}", file=out)
+    print("\n  開始(秒)  所要(秒)  モジュール", file=out)
+    for at, seconds, name, _ in sorted(roots, key=lambda record: -record[1])[:top]:
+        print(f"  {at:8.3f}  {seconds:8.3f}  {name}", file=out)
+    if len(roots) > top:
+        print(f"  ... 他 {len(roots) - top}個", file=out)
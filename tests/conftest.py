@@ -0,0 +1,74 @@
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from proxy_checker import ProxyChecker, SheetsApiScheduler  # noqa: E402
+from tests.fake_sheets import InMemoryWorksheet  # noqa: E402
+
+
+@pytest.fixture
+def make_checker():
+    """
+    ProxyCheckerを作成する（rowsを指定した場合はメモリ上のワークシートに接続済みにする）
+    
+    キーワード引数はProxyCheckerの属性として設定する（test_urls、timeoutなど）。
+    """
+    def make(rows=None, **attributes):
+        checker = ProxyChecker("", "")
+        if rows is not None:
+            checker.worksheet = InMemoryWorksheet(rows)
+            checker.api_scheduler = SheetsApiScheduler(read_per_minute=1e9, write_per_minute=1e9)
+        for name, value in attributes.items():
+            setattr(checker, name, value)
+        return checker
+    return make
+
+
+class EchoProxy(BaseHTTPRequestHandler):
+    """
+    プロキシとして受けたリクエストに、server.delay秒待ってからプロキシのIPを返す
+    
+    リクエスト先のパスごとの遅延・ステータスは、server.delays・server.statusesで変更する。
+    Keep-Aliveに対応し、受け付けた接続の送信元ポートをserver.connectionsに記録する。
+    """
+    
+    protocol_version = "HTTP/1.1"
+    
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        self.server.requests.append(path)
+        self.server.connections.add(self.client_address[1])
+        time.sleep(self.server.delays.get(path, self.server.delay))
+        body = json.dumps({'origin': '127.0.0.1'}).encode()
+        self.send_response(self.server.statuses.get(path, 200))
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def echo_proxy():
+    """ローカルの偽プロキシを起動し、そのサーバーを返す（受けたリクエストのパスはserver.requestsに記録する）"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), EchoProxy)
+    server.daemon_threads = True
+    server.delay = 0.0
+    server.delays = {}
+    server.statuses = {}
+    server.requests = []
+    server.connections = set()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
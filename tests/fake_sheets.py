@@ -0,0 +1,74 @@
+"""
+テストとベンチマークで使う、gspreadのワークシートの代わりのメモリ上のワークシート
+"""
+
+import re
+from collections import Counter
+from typing import Dict, List
+
+
+class InMemoryWorksheet:
+    """
+    gspreadのワークシートの代わりに使うメモリ上のワークシート
+
+    ProxyCheckerが使うメソッドだけを実装し、メソッドごとの呼び出し回数を記録する。
+    """
+
+    def __init__(self, rows: List[List[str]], title: str = "Sheet1"):
+        self.rows = [list(row) for row in rows]
+        self.title = title
+        self.id = 0
+        self.calls = Counter()
+
+    @staticmethod
+    def _parse_range(range_name: str):
+        match = re.match(r'^([A-Z])(\d+)(?::([A-Z])(\d*))?$', range_name)
+        first_col = ord(match.group(1)) - ord('A') + 1
+        first_row = int(match.group(2))
+        last_col = ord(match.group(3)) - ord('A') + 1 if match.group(3) else first_col
+        last_row = int(match.group(4)) if match.group(4) else (None if match.group(3) else first_row)
+        return first_row, first_col, last_row, last_col
+
+    def _value(self, row: int, col: int) -> str:
+        if row > len(self.rows) or col > len(self.rows[row - 1]):
+            return ""
+        return self.rows[row - 1][col - 1]
+
+    def _trim(self, values: List) -> List:
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+    def get(self, range_name: str, **kwargs) -> List[List[str]]:
+        self.calls['get'] += 1
+        first_row, first_col, last_row, last_col = self._parse_range(range_name)
+        last_row = last_row or len(self.rows)
+        return self._trim([
+            self._trim([self._value(row, col) for col in range(first_col, last_col + 1)])
+            for row in range(first_row, last_row + 1)
+        ])
+
+    def col_values(self, col: int, **kwargs) -> List[str]:
+        self.calls['col_values'] += 1
+        return self._trim([self._value(row, col) for row in range(1, len(self.rows) + 1)])
+
+    def row_values(self, row: int, **kwargs) -> List[str]:
+        self.calls['row_values'] += 1
+        return self._trim(list(self.rows[row - 1]) if row <= len(self.rows) else [])
+
+    def batch_update(self, data: List[Dict], **kwargs):
+        self.calls['batch_update'] += 1
+        for update in data:
+            first_row, first_col, _, _ = self._parse_range(update['range'])
+            for i, values in enumerate(update['values']):
+                for j, value in enumerate(values):
+                    row, col = first_row + i, first_col + j
+                    while len(self.rows) < row:
+                        self.rows.append([])
+                    while len(self.rows[row - 1]) < col:
+                        self.rows[row - 1].append("")
+                    self.rows[row - 1][col - 1] = value
+
+    @property
+    def api_calls(self) -> int:
+        return sum(self.calls.values())
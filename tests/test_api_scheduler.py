@@ -0,0 +1,164 @@
+import types
+
+import pytest
+
+import proxy_checker
+from proxy_checker import SheetsApiScheduler, _TokenBucket
+from tests.fake_sheets import InMemoryWorksheet
+
+
+class FakeClock:
+    """proxy_checkerのtimeモジュールの代わり（sleepは待たずに時計を進める）"""
+    
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+    
+    def monotonic(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(proxy_checker, "time", clock)
+    return clock
+
+
+class ApiError(Exception):
+    def __init__(self, status, headers=None):
+        super().__init__(f"HTTP {status}")
+        self.response = types.SimpleNamespace(status_code=status, headers=headers or {})
+
+
+def failing(errors, value="ok"):
+    """errorsを順に送出し、尽きたらvalueを返す関数（呼び出し回数はcallsに記録する）"""
+    errors = list(errors)
+    
+    def func():
+        func.calls += 1
+        if errors:
+            raise errors.pop(0)
+        return value
+    func.calls = 0
+    return func
+
+
+def test_bucket_allows_burst_then_waits(clock):
+    # 600回/分: 60回までまとめて呼び出せ、その後は9回/秒
+    bucket = _TokenBucket(600)
+    assert [bucket.acquire() for _ in range(60)] == [0.0] * 60
+    assert bucket.acquire() == pytest.approx(1 / 9)
+    assert bucket.acquire() == pytest.approx(1 / 9)
+    assert clock.now == pytest.approx(1000 + 2 / 9)
+
+
+def test_bucket_reserves_tokens_for_waiting_calls(clock):
+    # 待機はロックの外で行うため、ほかの呼び出しが待っている間に来た呼び出しはさらに後ろで待つ
+    clock.sleep = lambda seconds: None
+    bucket = _TokenBucket(600)
+    for _ in range(60):
+        bucket.acquire()
+    assert [bucket.acquire() for _ in range(3)] == pytest.approx([1 / 9, 2 / 9, 3 / 9])
+
+
+def test_bucket_refills_up_to_burst(clock):
+    bucket = _TokenBucket(600)
+    for _ in range(60):
+        bucket.acquire()
+    
+    clock.now += 2
+    assert [bucket.acquire() for _ in range(18)] == [0.0] * 18
+    assert bucket.acquire() > 0
+    
+    # 長く空いても、まとめて呼び出せるのはburst回まで
+    clock.now += 3600
+    assert [bucket.acquire() for _ in range(60)] == [0.0] * 60
+    assert bucket.acquire() > 0
+
+
+def test_bucket_stays_within_limit_for_any_minute(clock):
+    bucket = _TokenBucket(120)
+    calls = []
+    for _ in range(500):
+        bucket.acquire()
+        calls.append(clock.now)
+    assert max(sum(1 for t in calls if start <= t < start + 60) for start in calls) <= 120
+
+
+def test_drain_makes_next_call_wait(clock):
+    bucket = _TokenBucket(600)
+    bucket.drain()
+    assert bucket.acquire() == pytest.approx(1 / 9)
+
+
+def test_call_retries_429_with_backoff(clock):
+    scheduler = SheetsApiScheduler(600, 600, backoff_base=1.0)
+    bucket = scheduler.buckets['write']
+    func = failing([ApiError(429), ApiError(429), ApiError(503)])
+    tokens = []
+    
+    def record_tokens():
+        tokens.append(bucket.tokens)
+        return func()
+    
+    assert scheduler.call("write", "batch_update", record_tokens) == "ok"
+    assert func.calls == 4
+    assert scheduler.stats['retried'] == 3
+    # 待機は上限（1, 2, 4秒）の半分から上限まで
+    assert len(clock.sleeps) == 3
+    for attempt, delay in enumerate(clock.sleeps):
+        assert 2 ** attempt / 2 <= delay <= 2 ** attempt
+    # 429の後はバケットを空にし、待機中に補充された分だけが残る
+    assert tokens[1] == pytest.approx(9 * clock.sleeps[0] - 1)
+
+
+def test_call_honours_retry_after(clock):
+    scheduler = SheetsApiScheduler(600, 600, backoff_base=1.0)
+    func = failing([ApiError(429, {'Retry-After': '30'})])
+    
+    assert scheduler.call("read", "get", func) == "ok"
+    assert 30 in clock.sleeps
+
+
+def test_call_does_not_retry_other_errors(clock):
+    scheduler = SheetsApiScheduler(600, 600)
+    func = failing([ApiError(400)])
+    
+    with pytest.raises(ApiError):
+        scheduler.call("read", "get", func)
+    assert func.calls == 1
+    assert scheduler.stats['retried'] == 0
+
+
+def test_call_gives_up_after_max_retries(clock):
+    scheduler = SheetsApiScheduler(600, 600, max_retries=2)
+    func = failing([ApiError(429)] * 5)
+    
+    with pytest.raises(ApiError):
+        scheduler.call("read", "get", func)
+    assert func.calls == 3
+
+
+def test_batch_update_is_written_once_after_429(clock):
+    worksheet = InMemoryWorksheet([["プロキシ", "ステータス"], ["10.0.0.1:8080"]])
+    write = worksheet.batch_update
+    errors = [ApiError(429)]
+    
+    def batch_update(data, **kwargs):
+        worksheet.calls['batch_update_attempt'] += 1
+        if errors:
+            raise errors.pop(0)
+        return write(data, **kwargs)
+    worksheet.batch_update = batch_update
+    
+    scheduler = SheetsApiScheduler(600, 600)
+    scheduler.batch_update(worksheet, [{'range': 'B2', 'values': [["有効"]]}], max_bytes=1000)
+    
+    assert worksheet.calls['batch_update_attempt'] == 2
+    assert worksheet.calls['batch_update'] == 1
+    assert worksheet.rows[1] == ["10.0.0.1:8080", "有効"]
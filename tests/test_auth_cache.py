@@ -0,0 +1,112 @@
+import json
+import os
+import stat
+import time
+import types
+from datetime import datetime, timedelta
+
+import pytest
+
+import proxy_checker
+from proxy_checker import AuthCache
+
+IDENTITY = "checker@test.iam.gserviceaccount.com/key1"
+SCOPES = ["https://www.googleapis.com/auth/drive", "https://spreadsheets.google.com/feeds"]
+SPREADSHEET = {'title': "リスト"}
+WORKSHEET = {'sheetId': 42, 'title': "プロキシ", 'index': 1}
+
+
+def expiry_in(seconds):
+    # google-authと同じく、タイムゾーンなしのUTC
+    return datetime.utcnow().replace(microsecond=0) + timedelta(seconds=seconds)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "auth_cache.json")
+
+
+@pytest.mark.skipif(os.name != 'posix', reason="ファイルの権限はPOSIXのみ")
+def test_file_is_written_owner_only(path):
+    cache = AuthCache(path)
+    cache.store_token(IDENTITY, SCOPES, "token", expiry_in(3600))
+    cache.save()
+    
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert not os.path.exists(path + ".tmp")
+
+
+@pytest.mark.skipif(os.name != 'posix', reason="ファイルの権限はPOSIXのみ")
+def test_file_readable_by_others_is_ignored(path, capsys):
+    cache = AuthCache(path)
+    cache.store_token(IDENTITY, SCOPES, "token", expiry_in(3600))
+    cache.save()
+    os.chmod(path, 0o644)
+    
+    assert AuthCache(path).token(IDENTITY, SCOPES) is None
+    assert "ほかのユーザーが読める権限" in capsys.readouterr().out
+
+
+def test_token_round_trip_and_expiry_margin(path):
+    expiry = expiry_in(3600)
+    cache = AuthCache(path)
+    cache.store_token(IDENTITY, SCOPES, "token", expiry)
+    cache.save()
+    
+    assert AuthCache(path).token(IDENTITY, list(reversed(SCOPES))) == ("token", expiry)
+    
+    # 有効期限までの残りがEXPIRY_MARGIN未満のトークンは使わない
+    cache.store_token(IDENTITY, SCOPES, "token", expiry_in(AuthCache.EXPIRY_MARGIN - 10))
+    assert cache.token(IDENTITY, SCOPES) is None
+    cache.store_token(IDENTITY, SCOPES, "token", expiry_in(AuthCache.EXPIRY_MARGIN + 10))
+    assert cache.token(IDENTITY, SCOPES) is not None
+
+
+def test_other_identity_or_scopes_are_not_used(path):
+    cache = AuthCache(path)
+    cache.store_token(IDENTITY, SCOPES, "token", expiry_in(3600))
+    
+    assert cache.token("checker@test.iam.gserviceaccount.com/key2", SCOPES) is None
+    assert cache.token(IDENTITY, SCOPES[:1]) is None
+
+
+def test_worksheet_entries(path):
+    cache = AuthCache(path)
+    cache.store_token(IDENTITY, SCOPES, "token", expiry_in(3600))
+    cache.store_worksheet("key", SPREADSHEET, WORKSHEET)
+    cache.save()
+    
+    loaded = AuthCache(path)
+    assert loaded.worksheet("key", "プロキシ") == (SPREADSHEET, WORKSHEET)
+    assert loaded.worksheet("key", "Sheet1") is None
+    assert loaded.worksheet("other", "プロキシ") is None
+    
+    loaded.forget_worksheet("key", "プロキシ")
+    assert loaded.worksheet("key", "プロキシ") is None
+    
+    # 別の認証情報のトークンを保存すると、ワークシートの情報も破棄する
+    cache.store_token("other@test.iam.gserviceaccount.com/key1", SCOPES, "token2", expiry_in(3600))
+    assert cache.worksheet("key", "プロキシ") is None
+
+
+def test_entry_without_spreadsheet_properties_is_a_miss(path):
+    # スプレッドシートのプロパティを保存していなかった以前のファイル
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'spreadsheets': {'key': {'worksheets': {"プロキシ": WORKSHEET}}}}, f)
+    os.chmod(path, 0o600)
+    assert AuthCache(path).worksheet("key", "プロキシ") is None
+
+
+def test_broken_file_is_discarded(path):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("{")
+    os.chmod(path, 0o600)
+    assert AuthCache(path).token(IDENTITY, SCOPES) is None
+
+
+def test_expiry_is_compared_with_current_time(path, monkeypatch):
+    cache = AuthCache(path)
+    cache.store_token(IDENTITY, SCOPES, "token", expiry_in(3600))
+    now = time.time()
+    monkeypatch.setattr(proxy_checker, "time", types.SimpleNamespace(time=lambda: now + 3600))
+    assert cache.token(IDENTITY, SCOPES) is None
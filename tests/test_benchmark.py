@@ -0,0 +1,60 @@
+import pytest
+
+from benchmark import (BEHAVIOR_AUTH, BEHAVIOR_FAIL, BEHAVIOR_OK, BEHAVIOR_TIMEOUT, MockProxyFarm,
+                       compare_with_baseline, percentile, run_mode)
+
+
+@pytest.fixture(scope="module")
+def farm():
+    farm = MockProxyFarm(count=12, latency=0.0, failure_rate=0.2, auth_failure_rate=0.2, timeout_rate=0.1, seed=3)
+    farm.start()
+    yield farm
+    farm.stop()
+
+
+def test_behaviors_follow_seed():
+    first = MockProxyFarm(count=50, seed=7).behaviors
+    assert MockProxyFarm(count=50, seed=7).behaviors == first
+    assert set(first) <= {BEHAVIOR_OK, BEHAVIOR_FAIL, BEHAVIOR_AUTH, BEHAVIOR_TIMEOUT}
+    assert MockProxyFarm(count=20, failure_rate=0, auth_failure_rate=0, timeout_rate=0).behaviors == \
+        [BEHAVIOR_OK] * 20
+
+
+def test_only_working_proxies_are_valid(farm, make_checker):
+    checker = make_checker(test_urls=farm.test_urls, timeout=0.3)
+    results = checker.check_all_proxies(farm.proxies, concurrency=12)
+    
+    assert [result.is_valid for result in results] == [behavior == BEHAVIOR_OK for behavior in farm.behaviors]
+    # 認証エラーのプロキシは認証情報付きの形式
+    for proxy, behavior in zip(farm.proxies, farm.behaviors):
+        assert proxy.endswith(":user:pass") == (behavior == BEHAVIOR_AUTH)
+
+
+@pytest.mark.parametrize("mode", ["async:block", "serial:cell", "async:stream"])
+def test_run_mode_reports_counts(farm, mode):
+    report = run_mode(farm, mode, concurrency=12, timeout=0.3)
+    
+    assert report['mode'] == mode
+    assert report['proxies'] == farm.count
+    assert report['valid'] == farm.behaviors.count(BEHAVIOR_OK)
+    assert report['api_calls'] == sum(report['api_calls_by_method'].values())
+    assert report['p50_latency'] <= report['p95_latency']
+    if mode == "async:block":
+        assert report['api_calls_by_method'] == {'get': 1, 'batch_update': 1}
+
+
+def test_percentile():
+    assert percentile([], 95) == 0.0
+    assert percentile([3, 1, 2], 50) == 2
+    assert percentile(list(range(101)), 95) == 95
+
+
+def test_regressions_against_baseline():
+    baseline = {'async:block': {'proxies_per_sec': 100, 'p95_latency': 1.0, 'api_calls': 2}}
+    report = {'mode': 'async:block', 'proxies_per_sec': 85, 'p95_latency': 1.1, 'api_calls': 2}
+    assert compare_with_baseline([report], baseline, tolerance=0.2) == []
+    
+    report.update(proxies_per_sec=79, p95_latency=1.3, api_calls=3)
+    regressions = compare_with_baseline([report, dict(report, mode="serial:cell")], baseline, tolerance=0.2)
+    assert len(regressions) == 3
+    assert all(line.startswith("async:block") for line in regressions)
@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from proxy_checker import CheckpointJournal, CheckResult, ErrorClass
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return CheckpointJournal(str(tmp_path / "journal.jsonl"), "key", "Sheet1")
+
+
+def test_load_keeps_check_date(journal):
+    journal.append(2, CheckResult("10.0.0.1:8080", True, errors=bytes([ErrorClass.OK])))
+    with open(journal.path, encoding='utf-8') as f:
+        entry = json.loads(f.readline())
+    
+    loaded = journal.load()
+    assert loaded[2].checked_at == entry['checked_at']
+    assert loaded[2].proxy == "10.0.0.1:8080" and loaded[2].is_valid
+
+
+def test_resumed_rows_written_with_original_date(journal, make_checker):
+    proxies = ["10.0.0.1:8080", "10.0.0.2:8080"]
+    checker = make_checker([["プロキシ"]] + [[proxy] for proxy in proxies])
+    with open(journal.path, 'w', encoding='utf-8') as f:
+        entry = {'spreadsheet_key': "key", 'worksheet': "Sheet1", 'row': 2, 'checked_at': "2020-01-02 03:04:05"}
+        entry.update(CheckResult(proxies[0], True, errors=bytes([ErrorClass.OK])).to_dict())
+        f.write(json.dumps(entry) + "\n")
+    
+    resumed = journal.load()[2]
+    fresh = CheckResult(proxies[1], False, errors=bytes([ErrorClass.TIMEOUT]))
+    checker.write_results([resumed, fresh], track_changes=False)
+    
+    assert checker.worksheet._value(2, 4) == "2020-01-02 03:04:05"
+    assert checker.worksheet._value(3, 4) not in ("", "2020-01-02 03:04:05")
+
+
+def test_other_worksheets_are_kept(journal):
+    other = CheckpointJournal(journal.path, "key", "Sheet2")
+    journal.append(2, CheckResult("10.0.0.1:8080", True))
+    other.append(2, CheckResult("10.0.0.2:8080", False))
+    journal.clear()
+    assert journal.load() == {}
+    assert other.load()[2].proxy == "10.0.0.2:8080"
+
+
+@pytest.fixture
+def interrupted(journal, make_checker, echo_proxy):
+    """2件のうち1件だけジャーナルに記録された（中断された）状態のProxyChecker"""
+    proxies = [f"127.0.0.1:{echo_proxy.server_address[1]}", f"127.0.0.1:{echo_proxy.server_address[1]}:user:pass"]
+    checker = make_checker([["プロキシ"]] + [[proxy] for proxy in proxies], spreadsheet_key="key",
+                           worksheet_name="Sheet1", test_urls=["http://example.test/ip"])
+    journal.append(2, CheckResult(proxies[0], False, errors=bytes([ErrorClass.TIMEOUT])))
+    return checker
+
+
+def run(checker, journal, **kwargs):
+    return checker.run(strict=False, track_changes=False, journal_file=journal.path, **kwargs)
+
+
+def test_existing_journal_requires_resume_or_fresh(interrupted, journal, capsys):
+    with pytest.raises(SystemExit):
+        run(interrupted, journal)
+    
+    assert "--resume" in capsys.readouterr().out
+    assert 2 in journal.load()
+    assert interrupted.worksheet.calls['get'] == 0
+
+
+def test_resume_reuses_journal(interrupted, journal, echo_proxy):
+    run(interrupted, journal, resume=True)
+    
+    assert len(echo_proxy.requests) == 1
+    assert interrupted.worksheet._value(2, 2) == "無効"
+    assert interrupted.worksheet._value(3, 2) == "有効"
+    assert journal.load() == {}
+
+
+def test_fresh_discards_journal(interrupted, journal, echo_proxy):
+    run(interrupted, journal, fresh=True)
+    
+    assert len(echo_proxy.requests) == 2
+    assert interrupted.worksheet._value(2, 2) == "有効"
+    assert journal.load() == {}
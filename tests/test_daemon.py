@@ -0,0 +1,94 @@
+import signal
+
+import pytest
+
+import proxy_checker
+from proxy_checker import ProxyMetrics, run_daemon
+
+
+@pytest.fixture(autouse=True)
+def no_signal_handlers(monkeypatch):
+    """run_daemonがテストプロセスのシグナルハンドラーを置き換えないようにする"""
+    installed = {}
+    monkeypatch.setattr(proxy_checker.signal, "signal", lambda signum, handler: installed.__setitem__(signum, handler))
+    return installed
+
+
+def fake_run(checker, sweeps, fail=()):
+    """checker.runを、受け取った引数を記録してsweeps回目で停止を要求するものに置き換える"""
+    calls = []
+    
+    def run(**kwargs):
+        calls.append(dict(kwargs))
+        if len(calls) in fail:
+            raise SystemExit(1)
+        if len(calls) >= sweeps:
+            checker.stop_requested.set()
+    
+    checker.run = run
+    return calls
+
+
+def test_resumes_only_on_first_sweep(make_checker):
+    checker = make_checker()
+    calls = fake_run(checker, sweeps=3)
+    
+    run_daemon(checker, 0, proxy_column="A", resume=True, fresh=False)
+    
+    assert [(c["resume"], c["fresh"]) for c in calls] == [(True, False), (False, True), (False, True)]
+    assert all(c["proxy_column"] == "A" for c in calls)
+
+
+def test_stop_signal_ends_loop_after_current_sweep(make_checker, no_signal_handlers):
+    checker = make_checker()
+    calls = []
+    
+    def run(**kwargs):
+        calls.append(kwargs)
+        # チェック中にSIGTERMを受け取っても、このrunは最後まで実行される
+        no_signal_handlers[signal.SIGTERM](signal.SIGTERM, None)
+    
+    checker.run = run
+    closed = []
+    checker.session_pool.close = lambda: closed.append(True)
+    
+    run_daemon(checker, 3600)
+    
+    assert len(calls) == 1
+    assert closed == [True]
+
+
+def test_failed_sweep_waits_for_next_interval(make_checker):
+    checker = make_checker()
+    checker.worksheet = object()
+    calls = fake_run(checker, sweeps=2, fail=(1,))
+    
+    run_daemon(checker, 0)
+    
+    assert len(calls) == 2
+
+
+def test_failure_before_connecting_exits(make_checker):
+    checker = make_checker()
+    fake_run(checker, sweeps=2, fail=(1,))
+    
+    with pytest.raises(SystemExit):
+        run_daemon(checker, 0)
+
+
+def test_metrics_file_written_after_each_sweep(make_checker, tmp_path):
+    checker = make_checker(metrics=ProxyMetrics())
+    path = tmp_path / "proxy_checker.prom"
+    calls = fake_run(checker, sweeps=2)
+    
+    def run(**kwargs):
+        checker.metrics.record_run(1.0)
+        original(**kwargs)
+    
+    original = checker.run
+    checker.run = run
+    
+    run_daemon(checker, 0, metrics_file=str(path))
+    
+    assert len(calls) == 2
+    assert "proxy_checker_runs_total 2" in path.read_text(encoding="utf-8")
@@ -0,0 +1,52 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 使う処理の中で読み込むモジュール（起動時・--help・ファイルでのチェックの準備では読み込まない）
+HEAVY_MODULES = ["gspread", "google.auth", "google.oauth2", "requests", "urllib3", "asyncio",
+                 "concurrent.futures", "http.server", "phase_timing"]
+
+
+def loaded_modules(code):
+    """新しいPythonプロセスでcodeを実行し、HEAVY_MODULESのうち読み込まれたものを返す"""
+    script = code + f"\nimport json, sys\nprint(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    output = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True,
+                            check=True, timeout=60).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_import_does_not_load_heavy_modules():
+    assert loaded_modules("import proxy_checker") == []
+
+
+def test_help_does_not_load_heavy_modules():
+    code = (
+        "import sys, proxy_checker\n"
+        "sys.argv = ['proxy_checker.py', '--help']\n"
+        "try:\n"
+        "    proxy_checker.main()\n"
+        "except SystemExit:\n"
+        "    pass"
+    )
+    assert loaded_modules(code) == []
+
+
+def test_file_io_setup_does_not_load_heavy_modules():
+    code = (
+        "import proxy_checker, proxy_io\n"
+        "checker = proxy_checker.ProxyChecker('', '')\n"
+        "proxy_io.open_sink(checker, '-', None)"
+    )
+    assert loaded_modules(code) == []
+
+
+def test_session_pool_loads_requests_but_not_google_libraries():
+    code = (
+        "import proxy_checker\n"
+        "proxy_checker.ProxyChecker('', '').session_pool.get('http://127.0.0.1:9')"
+    )
+    loaded = loaded_modules(code)
+    assert "requests" in loaded and "phase_timing" in loaded
+    assert not [name for name in loaded if name.startswith(("gspread", "google"))]
@@ -0,0 +1,180 @@
+import json
+import re
+from datetime import datetime, timedelta
+
+import gspread
+import pytest
+import requests
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from proxy_checker import AuthCache, SheetsApiScheduler
+
+SHEETS = [
+    {'properties': {'sheetId': 0, 'title': "Sheet1", 'index': 0,
+                    'gridProperties': {'rowCount': 1000, 'columnCount': 26}}},
+    {'properties': {'sheetId': 42, 'title': "プロキシ", 'index': 1,
+                    'gridProperties': {'rowCount': 500, 'columnCount': 8}}},
+]
+
+
+class FakeSheetsSession(requests.Session):
+    """Sheets APIの代わりに、メタデータと値の取得に応答するセッション（リクエストのURLを記録する）"""
+    
+    def __init__(self):
+        super().__init__()
+        self.urls = []
+        # 値の取得に、成功する代わりに返すステータスコード（先頭から順に使う）
+        self.value_errors = []
+    
+    def request(self, method, url, *args, **kwargs):
+        self.urls.append(url)
+        status = 200
+        if re.search(r'/spreadsheets/[^/]+$', url):
+            body = {'spreadsheetId': "key", 'properties': {'title': "リスト"}, 'sheets': SHEETS}
+        elif self.value_errors:
+            status = self.value_errors.pop(0)
+            body = {'error': {'code': status, 'message': "error", 'status': "FAILED_PRECONDITION"}}
+        else:
+            body = {'range': "'プロキシ'!A1:B2", 'majorDimension': "ROWS", 'values': [["proxy", "status"]]}
+        response = requests.Response()
+        response.status_code = status
+        response.url = url
+        response._content = json.dumps(body).encode()
+        return response
+
+
+@pytest.fixture
+def checker(make_checker):
+    return make_checker(spreadsheet_key="key", worksheet_name="プロキシ",
+                        client=gspread.Client(None, session=FakeSheetsSession()))
+
+
+def session_of(checker):
+    client = checker.client
+    return getattr(client, 'http_client', client).session
+
+
+def test_worksheet_from_cached_properties_skips_metadata(checker):
+    spreadsheet = checker.client.open_by_key("key")
+    spreadsheet_properties, properties = checker._find_worksheet_properties(spreadsheet)
+    assert spreadsheet_properties == {'title': "リスト"}
+    assert properties['sheetId'] == 42
+    assert len(session_of(checker).urls) == 2
+    
+    # キャッシュしたプロパティ（JSONを通したもの）からは、メタデータを取得せずに作成する
+    worksheet = checker._worksheet_from_properties(spreadsheet, json.loads(json.dumps(properties)))
+    assert (worksheet.id, worksheet.title, worksheet.row_count) == (42, "プロキシ", 500)
+    assert len(session_of(checker).urls) == 2
+    
+    assert worksheet.get("A1:B2") == [["proxy", "status"]]
+    assert "/values/" in session_of(checker).urls[-1]
+
+
+def test_missing_worksheet_raises(checker):
+    checker.worksheet_name = "ない"
+    spreadsheet = checker.client.open_by_key("key")
+    with pytest.raises(gspread.exceptions.WorksheetNotFound):
+        checker._find_worksheet_properties(spreadsheet)
+
+
+@pytest.fixture(scope="module")
+def credentials_file(tmp_path_factory):
+    """サービスアカウントの認証情報ファイル（テスト用に作成した鍵）"""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                            serialization.NoEncryption()).decode()
+    path = tmp_path_factory.mktemp("auth") / "credentials.json"
+    path.write_text(json.dumps({
+        'type': "service_account", 'project_id': "test", 'private_key_id': "key1", 'private_key': pem,
+        'client_email': "checker@test.iam.gserviceaccount.com", 'client_id': "1",
+        'token_uri': "https://oauth2.googleapis.com/token",
+    }), encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def session(monkeypatch):
+    """gspread.authorizeが作るクライアントの通信先をFakeSheetsSessionにする"""
+    session = FakeSheetsSession()
+    
+    def authorize(creds, *args, **kwargs):
+        if creds.token is None:
+            # 認証した場合と同じく、トークンと有効期限を設定する
+            creds.token, creds.expiry = "fresh-token", datetime.utcnow() + timedelta(hours=1)
+        return gspread.Client(creds, session=session)
+    
+    monkeypatch.setattr(gspread, "authorize", authorize)
+    return session
+
+
+@pytest.fixture
+def connect(make_checker, credentials_file, tmp_path):
+    """auth_cacheを使って接続したProxyCheckerを返す（呼び出すたびに新しく起動した場合と同じ）"""
+    def connect():
+        checker = make_checker(spreadsheet_key="key", worksheet_name="プロキシ", credentials_file=credentials_file,
+                               auth_cache=AuthCache(str(tmp_path / "auth_cache.json")),
+                               api_scheduler=SheetsApiScheduler(1e9, 1e9))
+        checker.connect_spreadsheet()
+        return checker
+    return connect
+
+
+def test_cache_hit_makes_no_metadata_requests(connect, session, tmp_path):
+    first = connect()
+    assert len(session.urls) == 2
+    assert not first.worksheet_from_cache
+    
+    session.urls.clear()
+    checker = connect()
+    
+    # 最初のAPI呼び出しがシートの値の読み込みになる
+    assert session.urls == []
+    assert checker.worksheet_from_cache
+    assert checker.credentials.token == "fresh-token"
+    assert (checker.worksheet.id, checker.worksheet.title) == (42, "プロキシ")
+    assert checker.worksheet.get("A1:B2") == [["proxy", "status"]]
+    assert len(session.urls) == 1 and "/values/" in session.urls[0]
+
+
+def test_refreshed_token_is_saved(connect, session, tmp_path):
+    connect()
+    checker = connect()
+    saved = []
+    checker.auth_cache.save = lambda: saved.append(True)
+    
+    # トークンが変わっていなければ書き込まない
+    checker.save_auth_cache()
+    assert saved == []
+    
+    # 実行中に更新されたトークンは保存し、次の起動で使う
+    checker.credentials.token = "refreshed-token"
+    checker.credentials.expiry = datetime.utcnow() + timedelta(hours=1)
+    del checker.auth_cache.save
+    checker.save_auth_cache()
+    assert connect().credentials.token == "refreshed-token"
+    assert json.loads((tmp_path / "auth_cache.json").read_text())['token'] == "refreshed-token"
+
+
+def test_run_reconnects_when_cached_worksheet_is_gone(connect, session):
+    connect()
+    checker = connect()
+    session.urls.clear()
+    # キャッシュした後にワークシートの名前が変わった場合、範囲を解釈できず400になる
+    session.value_errors = [400]
+    
+    assert checker.run() == []
+    
+    assert not checker.worksheet_from_cache
+    assert sum("/values/" not in url for url in session.urls) == 2
+
+
+def test_run_does_not_reconnect_on_other_errors(connect, session):
+    connect()
+    checker = connect()
+    session.urls.clear()
+    session.value_errors = [403]
+    
+    with pytest.raises(gspread.exceptions.APIError):
+        checker.run()
+    assert all("/values/" in url for url in session.urls)
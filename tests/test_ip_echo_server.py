@@ -0,0 +1,47 @@
+import asyncio
+import json
+
+import pytest
+
+import ip_echo_server
+
+
+async def exchange(requests):
+    """IPエコーサーバーを起動し、1つの接続でrequestsを順に送って、閉じられるまでの応答を返す"""
+    server = await ip_echo_server.start_server("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        for request in requests:
+            writer.write(request)
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+        return response
+
+
+def test_echoes_client_ip():
+    response = asyncio.run(exchange([b"GET /ip HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n"]))
+    head, body = response.split(b"\r\n\r\n", 1)
+    assert head.startswith(b"HTTP/1.1 200 OK")
+    assert json.loads(body) == {"origin": "127.0.0.1", "ip": "127.0.0.1", "query": "127.0.0.1"}
+
+
+def test_request_body_is_skipped_for_keep_alive():
+    response = asyncio.run(exchange([
+        b"POST /ip HTTP/1.1\r\nHost: x\r\nContent-Length: 5\r\n\r\nhello",
+        b"GET /ip HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n",
+    ]))
+    assert response.count(b"HTTP/1.1 200 OK") == 2
+
+
+@pytest.mark.parametrize("value, status", [
+    (b"abc", b"400 Bad Request"),
+    (b"-1", b"400 Bad Request"),
+    (b"+5", b"400 Bad Request"),
+    (str(ip_echo_server.MAX_BODY_BYTES + 1).encode(), b"413 Payload Too Large"),
+])
+def test_invalid_content_length_is_rejected(value, status):
+    response = asyncio.run(exchange([b"POST /ip HTTP/1.1\r\nHost: x\r\nContent-Length: " + value + b"\r\n\r\n"]))
+    assert response.startswith(b"HTTP/1.1 " + status + b"\r\n")
+    assert b"Connection: close" in response
@@ -0,0 +1,91 @@
+import json
+
+from proxy_checker import ErrorClass, LatencyHistory
+
+PROXY = "http://10.0.0.1:8080"
+
+
+def test_default_timeout_until_enough_samples(tmp_path):
+    history = LatencyHistory(str(tmp_path / "history.json"), min_samples=3)
+    assert history.timeout_for(PROXY, 10) == 10
+    
+    history.record(PROXY, [0.8, 1.0])
+    assert history.timeout_for(PROXY, 10) == 10
+    history.record(PROXY, [1.2])
+    assert history.timeout_for(PROXY, 10) == 2.4
+
+
+def test_timeout_from_percentile_is_clamped(tmp_path):
+    history = LatencyHistory(str(tmp_path / "history.json"), percentile=50, margin=2.0,
+                             floor=1.0, ceiling=5.0, min_samples=1)
+    history.record("http://fast:1", [0.1, 0.2, 0.1])
+    history.record("http://steady:1", [1.0, 1.5, 9.0])
+    history.record("http://slow:1", [4.0, 6.0, 8.0])
+    
+    assert history.timeout_for("http://fast:1", 10) == 1.0
+    assert history.timeout_for("http://steady:1", 10) == 3.0
+    assert history.timeout_for("http://slow:1", 10) == 5.0
+
+
+def test_keeps_only_latest_window_and_evicts_oldest_proxy(tmp_path):
+    history = LatencyHistory(str(tmp_path / "history.json"), window=3, max_entries=2, min_samples=1)
+    history.record("http://a:1", [1.0, 2.0])
+    history.record("http://b:1", [1.0])
+    history.record("http://a:1", [3.0, 4.0])
+    history.record("http://c:1", [1.0])
+    
+    assert history.median("http://a:1") == 3.0
+    # aは最近記録したため残り、最も古いbが消える
+    assert history.median("http://b:1") is None
+    assert len(history) == 2
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "history.json")
+    history = LatencyHistory(path, window=5)
+    history.record(PROXY, [0.12345, 0.5])
+    history.save()
+    
+    assert json.loads(open(path, encoding="utf-8").read()) == {PROXY: [0.123, 0.5]}
+    # 読み込み時にも新しいwindowを適用する
+    assert LatencyHistory(path, window=1).median(PROXY) == 0.5
+
+
+def test_broken_file_is_discarded(tmp_path):
+    path = tmp_path / "history.json"
+    path.write_text("{broken", encoding="utf-8")
+    history = LatencyHistory(str(path))
+    assert len(history) == 0
+
+
+def test_adaptive_timeout_gives_up_early_on_fast_proxy(echo_proxy, make_checker, tmp_path):
+    proxy = f"127.0.0.1:{echo_proxy.server_address[1]}"
+    history = LatencyHistory(str(tmp_path / "history.json"), floor=0.3, min_samples=3)
+    checker = make_checker(latency_history=history, timeout=5)
+    normalized = checker.normalize_proxy(proxy)
+    history.record(normalized, [0.01, 0.01, 0.01])
+    
+    echo_proxy.delay = 1.0
+    result = checker.check_proxy_result(proxy, strict=False, test_url="http://example.test/ip")
+    
+    assert not result.is_valid
+    assert result.timeout == 0.3
+    assert ErrorClass(result.errors[0]) == ErrorClass.TIMEOUT
+    assert history.timeouts == 1
+    assert history.saved_seconds == 4.7
+
+
+def test_record_only_history_keeps_fixed_timeout(echo_proxy, make_checker, tmp_path):
+    proxy = f"127.0.0.1:{echo_proxy.server_address[1]}"
+    history = LatencyHistory(str(tmp_path / "history.json"), floor=0.3, min_samples=1, adaptive=False)
+    checker = make_checker(latency_history=history, timeout=5)
+    normalized = checker.normalize_proxy(proxy)
+    history.record(normalized, [0.01])
+    
+    echo_proxy.delay = 0.5
+    result = checker.check_proxy_result(proxy, strict=False, test_url="http://example.test/ip")
+    
+    assert result.is_valid
+    assert result.timeout == 5
+    # 成功した応答時間は記録される
+    assert history.median(normalized) > 0.01
@@ -0,0 +1,134 @@
+import re
+import urllib.error
+import urllib.request
+
+import pytest
+
+from proxy_checker import CheckResult, ErrorClass, ProxyMetrics
+
+SAMPLE = re.compile(r'^(?P<name>[a-z_]+)(?:\{(?P<labels>[^}]*)\})? (?P<value>[0-9.e+-]+)$')
+
+
+def parse(text):
+    """テキスト形式を (メトリクス名, ラベルの辞書) -> 値 に変換（宣言より前のサンプルや不正な行はエラー）"""
+    declared = {}
+    samples = {}
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ", 3)
+            declared[name] = kind
+            continue
+        if line.startswith("# HELP "):
+            continue
+        match = SAMPLE.match(line)
+        assert match, line
+        name = match.group("name")
+        base = re.sub(r'_(bucket|sum|count)$', '', name) if name not in declared else name
+        assert base in declared, line
+        labels = dict(re.findall(r'(\w+)="([^"]*)"', match.group("labels") or ""))
+        samples[(name, tuple(sorted(labels.items())))] = float(match.group("value"))
+    return declared, samples
+
+
+@pytest.fixture
+def metrics():
+    metrics = ProxyMetrics()
+    metrics.record_probe(True, "ok", 0.03, {"connect": 0.01, "ttfb": 0.02})
+    metrics.record_probe(True, "ok", 0.3, {"connect": 0.1})
+    metrics.record_probe(False, "timeout", 45.0, {})
+    metrics.record_checks([
+        CheckResult("10.0.0.1:8080", True, errors=bytes([ErrorClass.OK])),
+        CheckResult("10.0.0.2:8080", False, errors=bytes([ErrorClass.TIMEOUT])),
+        None,
+    ], duration=1.5)
+    metrics.record_api_call("get")
+    metrics.record_api_call("batch_update")
+    metrics.record_api_call("batch_update")
+    metrics.record_api_throttled("write", 0.25)
+    metrics.record_api_retry("batch_update", "429")
+    return metrics
+
+
+def test_render_declares_every_sample_and_labels_counters(metrics):
+    declared, samples = parse(metrics.render())
+    p = ProxyMetrics.PREFIX
+    
+    assert declared[f"{p}_probes_total"] == "counter"
+    assert declared[f"{p}_probe_duration_seconds"] == "histogram"
+    assert samples[(f"{p}_probes_total", (("error_class", "ok"), ("outcome", "success")))] == 2
+    assert samples[(f"{p}_probes_total", (("error_class", "timeout"), ("outcome", "failure")))] == 1
+    assert samples[(f"{p}_checks_total", (("outcome", "valid"), ("source", "check")))] == 1
+    assert samples[(f"{p}_checks_total", (("outcome", "invalid"), ("source", "check")))] == 1
+    assert samples[(f"{p}_sheets_api_calls_total", (("method", "batch_update"),))] == 2
+    assert samples[(f"{p}_sheets_api_throttled_seconds_total", (("kind", "write"),))] == 0.25
+    assert samples[(f"{p}_sheets_api_retries_total", (("method", "batch_update"), ("reason", "429")))] == 1
+    assert samples[(f"{p}_last_check_duration_seconds", ())] == 1.5
+    # record_runが呼ばれるまでは実行時間のゲージを出さない
+    assert f"{p}_last_run_duration_seconds" not in declared
+
+
+def test_histogram_buckets_are_cumulative_and_end_with_inf(metrics):
+    _, samples = parse(metrics.render())
+    name = f"{ProxyMetrics.PREFIX}_probe_duration_seconds"
+    buckets = [samples[(f"{name}_bucket", (("kind", "total"), ("le", str(bound))))]
+               for bound in ProxyMetrics.LATENCY_BUCKETS]
+    
+    assert buckets == sorted(buckets)
+    assert samples[(f"{name}_bucket", (("kind", "total"), ("le", "0.05")))] == 1
+    assert samples[(f"{name}_bucket", (("kind", "total"), ("le", "0.5")))] == 2
+    # 最大のバケットを超えた値は+Infにだけ数える
+    assert buckets[-1] == 2
+    assert samples[(f"{name}_bucket", (("kind", "total"), ("le", "+Inf")))] == 3
+    assert samples[(f"{name}_count", (("kind", "total"),))] == 3
+    assert samples[(f"{name}_sum", (("kind", "total"),))] == pytest.approx(45.33)
+    
+    phase = f"{ProxyMetrics.PREFIX}_probe_phase_seconds"
+    assert samples[(f"{phase}_count", (("phase", "connect"),))] == 2
+    assert samples[(f"{phase}_bucket", (("le", "0.1"), ("phase", "connect")))] == 2
+
+
+def test_value_on_bucket_bound_counts_in_that_bucket():
+    metrics = ProxyMetrics()
+    metrics.record_probe(True, "ok", 0.1, {})
+    _, samples = parse(metrics.render())
+    name = f"{ProxyMetrics.PREFIX}_probe_duration_seconds_bucket"
+    assert samples[(name, (("kind", "total"), ("le", "0.05")))] == 0
+    assert samples[(name, (("kind", "total"), ("le", "0.1")))] == 1
+
+
+def test_record_run_adds_run_gauges():
+    metrics = ProxyMetrics()
+    metrics.record_run(4.2)
+    metrics.record_run(3.0)
+    _, samples = parse(metrics.render())
+    p = ProxyMetrics.PREFIX
+    assert samples[(f"{p}_runs_total", ())] == 2
+    assert samples[(f"{p}_last_run_duration_seconds", ())] == 3.0
+    assert samples[(f"{p}_last_run_timestamp_seconds", ())] > 0
+
+
+def test_write_textfile_replaces_file_without_leaving_temp(tmp_path, metrics):
+    path = tmp_path / "proxy_checker.prom"
+    path.write_text("old\n", encoding="utf-8")
+    
+    metrics.write_textfile(str(path))
+    
+    assert path.read_text(encoding="utf-8") == metrics.render()
+    assert [p.name for p in tmp_path.iterdir()] == ["proxy_checker.prom"]
+
+
+def test_http_server_serves_metrics_and_404_elsewhere(metrics):
+    server = metrics.start_http_server(0, "127.0.0.1")
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with urllib.request.urlopen(f"{base}/metrics", timeout=5) as response:
+            assert response.status == 200
+            assert response.headers["Content-Type"] == "text/plain; version=0.0.4; charset=utf-8"
+            assert response.read().decode("utf-8") == metrics.render()
+        
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            urllib.request.urlopen(f"{base}/", timeout=5)
+        assert excinfo.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,82 @@
+import time
+
+from proxy_checker import ErrorClass
+
+TEST_URLS = ["http://example.test/a", "http://example.test/b", "http://example.test/c"]
+
+
+def outcome(success):
+    return (success, ErrorClass.OK if success else ErrorClass.TIMEOUT, None, {}, None)
+
+
+def test_verdict_decided_in_strict_mode(make_checker):
+    checker = make_checker()
+    # 3件中、成功率80%以上には3件とも成功する必要がある
+    assert not checker._is_verdict_decided({0: outcome(True)}, 3, strict=True)
+    assert not checker._is_verdict_decided({0: outcome(True), 1: outcome(True)}, 3, strict=True)
+    assert checker._is_verdict_decided({0: outcome(False)}, 3, strict=True)
+    assert checker._is_verdict_decided({0: outcome(True), 1: outcome(True), 2: outcome(True)}, 3, strict=True)
+    
+    # 5件中4件以上: 1件失敗しても未確定、2件失敗で確定
+    assert not checker._is_verdict_decided({0: outcome(False)}, 5, strict=True)
+    assert checker._is_verdict_decided({0: outcome(False), 3: outcome(False)}, 5, strict=True)
+
+
+def test_verdict_decided_by_first_success_without_strict(make_checker):
+    checker = make_checker()
+    assert not checker._is_verdict_decided({0: outcome(False)}, 3, strict=False)
+    assert checker._is_verdict_decided({1: outcome(True)}, 3, strict=False)
+
+
+def test_failure_aborts_remaining_probes(echo_proxy, make_checker):
+    echo_proxy.statuses["/a"] = 502
+    echo_proxy.delays["/b"] = 3.0
+    echo_proxy.delays["/c"] = 3.0
+    checker = make_checker(test_urls=TEST_URLS)
+    
+    started_at = time.perf_counter()
+    result = checker.check_proxy_result(f"127.0.0.1:{echo_proxy.server_address[1]}", timeout=5)
+    elapsed = time.perf_counter() - started_at
+    
+    assert not result.is_valid
+    assert elapsed < 1.0
+    assert [ErrorClass(error) for error in result.errors] == [
+        ErrorClass.HTTP_STATUS, ErrorClass.SKIPPED, ErrorClass.SKIPPED
+    ]
+    assert result.status_codes[0] == 502
+
+
+def test_all_probes_run_when_undecided(echo_proxy, make_checker):
+    echo_proxy.delays["/c"] = 0.2
+    checker = make_checker(test_urls=TEST_URLS)
+    
+    result = checker.check_proxy_result(f"127.0.0.1:{echo_proxy.server_address[1]}", timeout=5)
+    
+    assert result.is_valid
+    assert [ErrorClass(error) for error in result.errors] == [ErrorClass.OK] * 3
+    assert sorted(echo_proxy.requests) == ["/a", "/b", "/c"]
+
+
+def test_serial_probes_match_parallel_verdict(echo_proxy, make_checker):
+    echo_proxy.statuses["/b"] = 502
+    checker = make_checker(test_urls=TEST_URLS)
+    proxy = f"127.0.0.1:{echo_proxy.server_address[1]}"
+    
+    parallel = checker.check_proxy_result(proxy, timeout=5)
+    serial = checker.check_proxy_result(proxy, timeout=5, parallel=False)
+    
+    assert not parallel.is_valid and not serial.is_valid
+    # 並列でない場合は中断せず、すべてのテストURLの結果がある
+    assert ErrorClass.SKIPPED not in [ErrorClass(error) for error in serial.errors]
+
+
+def test_probes_share_one_bounded_pool(echo_proxy, make_checker):
+    checker = make_checker(test_urls=TEST_URLS, max_parallel_probes=4)
+    proxy = f"127.0.0.1:{echo_proxy.server_address[1]}"
+    
+    checker.check_proxy_result(proxy, timeout=5)
+    executor = checker._probe_executor
+    checker.check_proxy_result(proxy, timeout=5)
+    
+    assert checker._probe_executor is executor
+    assert executor._max_workers == 4
@@ -0,0 +1,34 @@
+import socket
+
+from proxy_checker import ErrorClass
+
+
+def test_falls_back_to_next_resolved_address(echo_proxy, monkeypatch, make_checker):
+    # 最初のアドレス（127.0.0.2）では待ち受けていないため、2番目のアドレスで接続する
+    real_getaddrinfo = socket.getaddrinfo
+    
+    def getaddrinfo(host, port, *args, **kwargs):
+        if host == "proxy.test":
+            return [(socket.AF_INET, socket.SOCK_STREAM, 6, '', ('127.0.0.2', port)),
+                    (socket.AF_INET, socket.SOCK_STREAM, 6, '', ('127.0.0.1', port))]
+        return real_getaddrinfo(host, port, *args, **kwargs)
+    
+    monkeypatch.setattr(socket, 'getaddrinfo', getaddrinfo)
+    checker = make_checker(test_urls=["http://example.test/ip"])
+    result = checker.check_proxy_result(f"http://proxy.test:{echo_proxy.server_address[1]}", strict=False, timeout=2)
+    
+    assert result.is_valid
+    assert ErrorClass(result.errors[0]) == ErrorClass.OK_UNVERIFIED
+    assert result.connect_ms is not None
+
+
+def test_all_addresses_unreachable(echo_proxy, monkeypatch, make_checker):
+    monkeypatch.setattr(socket, 'getaddrinfo', lambda host, port, *args, **kwargs: [
+        (socket.AF_INET, socket.SOCK_STREAM, 6, '', ('127.0.0.2', port)),
+        (socket.AF_INET, socket.SOCK_STREAM, 6, '', ('127.0.0.3', port))
+    ])
+    checker = make_checker(test_urls=["http://example.test/ip"])
+    result = checker.check_proxy_result(f"http://proxy.test:{echo_proxy.server_address[1]}", strict=False, timeout=2)
+    
+    assert not result.is_valid
+    assert ErrorClass(result.errors[0]) in (ErrorClass.REFUSED, ErrorClass.CONNECTION, ErrorClass.PROXY_ERROR)
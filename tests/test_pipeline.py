@@ -0,0 +1,133 @@
+import socket
+import time
+
+import pytest
+
+from proxy_io import SheetSource, run_pipeline
+
+TEST_URLS = ["http://example.test/"]
+
+
+class ListSource:
+    """リストからプロキシを返し、返すたびに書き出し済みの件数を記録する"""
+    
+    def __init__(self, proxies, sink):
+        self.proxies = proxies
+        self.sink = sink
+        self.backlog = []
+    
+    def __iter__(self):
+        for proxy in self.proxies:
+            self.backlog.append(len(self.backlog) - len(self.sink.rows))
+            yield proxy
+    
+    def close(self):
+        pass
+
+
+class ListSink:
+    def __init__(self):
+        self.rows = []
+        self.flushes = 0
+    
+    def start(self):
+        pass
+    
+    def add(self, index, result):
+        self.rows.append((index, result.proxy, result.is_valid))
+    
+    def flush(self):
+        self.flushes += 1
+    
+    def close(self):
+        return []
+
+
+@pytest.fixture
+def silent_proxy():
+    """接続は受け付けるが応答しないプロキシ"""
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    server.listen(16)
+    yield f"127.0.0.1:{server.getsockname()[1]}"
+    server.close()
+
+
+def test_slow_proxies_do_not_block_next_reads(echo_proxy, silent_proxy, make_checker):
+    fast = f"127.0.0.1:{echo_proxy.server_address[1]}"
+    proxies = [fast, silent_proxy, fast, fast, silent_proxy, fast, fast]
+    sink = ListSink()
+    source = ListSource(proxies, sink)
+    
+    checker = make_checker(test_urls=TEST_URLS, timeout=1)
+    
+    started_at = time.perf_counter()
+    run_pipeline(checker, source, sink, chunk_size=4, strict=False, engine="async", concurrency=4)
+    elapsed = time.perf_counter() - started_at
+    
+    # 2つ目の応答しないプロキシは1つ目の結果を待たずにチェックを始める（4件ずつのチェックなら2秒以上かかる）
+    assert elapsed < 1.8
+    assert [row[0] for row in sink.rows] == list(range(len(proxies)))
+    assert [row[2] for row in sink.rows] == [proxy == fast for proxy in proxies]
+    # 読み込んだが書き出していないプロキシはchunk_size件まで
+    assert max(source.backlog) <= 4
+
+
+def test_duplicates_share_one_check(echo_proxy, make_checker):
+    fast = f"127.0.0.1:{echo_proxy.server_address[1]}"
+    proxies = [fast, f"http://{fast}", fast]
+    sink = ListSink()
+    checker = make_checker(test_urls=TEST_URLS, timeout=1)
+    
+    run_pipeline(checker, ListSource(proxies, sink), sink, chunk_size=10, strict=False, engine="async")
+    
+    assert [row[1] for row in sink.rows] == proxies
+    assert checker.stats['deduplicated'] == 2
+
+
+def sheet_rows(count):
+    rows = [["プロキシ"]] + [[f"10.0.{i // 256}.{i % 256}:8080"] for i in range(count)]
+    # 空の行は読み飛ばす
+    rows[5] = [""]
+    return rows
+
+
+def test_sheet_source_reads_column_in_pages(make_checker):
+    checker = make_checker(sheet_rows(25))
+    
+    proxies = list(SheetSource(checker, "A", start_row=2, page_size=10))
+    
+    assert len(proxies) == 24
+    assert proxies[0] == "10.0.0.0:8080" and proxies[-1] == "10.0.0.24:8080"
+    # A2:A11, A12:A21, A22:A31（途中で値が終わったページで止まる）
+    assert dict(checker.worksheet.calls) == {'get': 3}
+
+
+def test_sheet_source_reads_up_to_row_count(make_checker):
+    checker = make_checker(sheet_rows(25) + [[""]] * 15)
+    checker.worksheet.row_count = 41
+    
+    proxies = list(SheetSource(checker, "A", start_row=2, page_size=10))
+    
+    assert len(proxies) == 24
+    # 途中に空のページがあっても行数まで読み込む（A2:A11 ... A32:A41）
+    assert dict(checker.worksheet.calls) == {'get': 4}
+
+
+def test_sheet_source_pages_are_read_as_checks_progress(make_checker):
+    checker = make_checker(sheet_rows(25))
+    source = iter(SheetSource(checker, "A", start_row=2, page_size=10))
+    
+    next(source)
+    assert checker.worksheet.calls['get'] == 1
+    for _ in range(10):
+        next(source)
+    assert checker.worksheet.calls['get'] == 2
+
+
+def test_sheet_source_uses_loaded_snapshot(make_checker):
+    checker = make_checker(sheet_rows(25))
+    checker.load_snapshot("A", "B")
+    
+    assert len(list(SheetSource(checker, "A", start_row=2, page_size=10))) == 24
+    assert dict(checker.worksheet.calls) == {'get': 1}
@@ -0,0 +1,56 @@
+from proxy_checker import SheetSnapshot
+
+ROWS = [
+    ["プロキシ", "ステータス"],
+    ["10.0.0.1:8080", "有効"],
+    ["10.0.0.2:8080", ""],
+    [" 10.0.0.3:8080 ", " 無効 "],
+    ["10.0.0.1:8080", "無効"],
+    [],
+    ["10.0.0.4:8080", "有効"],
+]
+
+
+def test_statuses_read_with_one_api_call(make_checker):
+    checker = make_checker(ROWS)
+    
+    statuses = checker.read_previous_statuses("A", "B", start_row=2)
+    
+    # 重複したプロキシは最初の行、空のステータスは含めない
+    assert statuses == {"10.0.0.1:8080": "有効", "10.0.0.3:8080": "無効", "10.0.0.4:8080": "有効"}
+    assert dict(checker.worksheet.calls) == {'get': 1}
+
+
+def test_loaded_snapshot_is_reused(make_checker):
+    checker = make_checker(ROWS)
+    checker.load_snapshot("A", "B")
+    
+    assert checker.read_proxies("A", start_row=2) == [
+        "10.0.0.1:8080", "10.0.0.2:8080", "10.0.0.3:8080", "10.0.0.1:8080", "10.0.0.4:8080"
+    ]
+    assert checker.read_previous_statuses("A", "B") == {
+        "10.0.0.1:8080": "有効", "10.0.0.3:8080": "無効", "10.0.0.4:8080": "有効"
+    }
+    assert dict(checker.worksheet.calls) == {'get': 1}
+
+
+def test_snapshot_reloaded_when_column_not_covered(make_checker):
+    checker = make_checker([row + ["", "済"] if row else row for row in ROWS])
+    checker.load_snapshot("A")
+    
+    checker.read_previous_statuses("A", "D")
+    
+    assert checker.worksheet.calls['get'] == 2
+    assert checker.snapshot.covers("D")
+
+
+def test_snapshot_matches_worksheet_reads():
+    snapshot = SheetSnapshot([["有効", "", "x"], [], ["無効"]], first_column="B")
+    
+    assert snapshot.cell(1, "B") == "有効"
+    assert snapshot.cell(1, "A") == ""
+    assert snapshot.cell(4, "B") == ""
+    assert snapshot.col_values("B") == ["有効", "", "無効"]
+    assert snapshot.col_values("C") == []
+    assert snapshot.row_values(1) == ["", "有効", "", "x"]
+    assert snapshot.row_values(2) == []
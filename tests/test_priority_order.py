@@ -0,0 +1,58 @@
+import pytest
+
+from proxy_checker import CheckResult, ErrorClass, LatencyHistory
+
+ROWS = [
+    ["プロキシ", "ステータス", "優先度"],
+    ["10.0.0.1:8080", "無効", "3"],
+    ["10.0.0.2:8080", "有効", ""],
+    ["10.0.0.3:8080", "有効", "1"],
+    ["10.0.0.4:8080", "", "2"],
+]
+PROXIES = [row[0] for row in ROWS[1:]]
+
+
+@pytest.fixture
+def checker(make_checker, tmp_path):
+    checker = make_checker(ROWS, latency_history=LatencyHistory(str(tmp_path / "history.json"), min_samples=1))
+    checker.load_snapshot("A", "B", "C")
+    return checker
+
+
+def test_keys_from_status_latency_and_column(checker):
+    history = checker.latency_history
+    history.record(checker.normalize_proxy("10.0.0.3:8080"), [0.5])
+    history.record(checker.normalize_proxy("10.0.0.4:8080"), [0.2])
+    
+    def ordered(order):
+        keys = checker.priority_keys(PROXIES, order, start_row=2, status_column="B", priority_column="C")
+        return [proxy for _, proxy in sorted(zip(keys, PROXIES))]
+    
+    assert ordered(["valid"]) == ["10.0.0.2:8080", "10.0.0.3:8080", "10.0.0.1:8080", "10.0.0.4:8080"]
+    # 履歴がないプロキシ、数値でない優先度は後
+    assert ordered(["latency"]) == ["10.0.0.4:8080", "10.0.0.3:8080", "10.0.0.1:8080", "10.0.0.2:8080"]
+    assert ordered(["column"]) == ["10.0.0.3:8080", "10.0.0.4:8080", "10.0.0.1:8080", "10.0.0.2:8080"]
+    assert ordered(["valid", "latency"]) == ["10.0.0.3:8080", "10.0.0.2:8080", "10.0.0.4:8080", "10.0.0.1:8080"]
+
+
+def test_unknown_order_is_rejected(checker):
+    with pytest.raises(ValueError):
+        checker.priority_keys(PROXIES, ["newest"])
+
+
+@pytest.mark.parametrize("engine", ["serial", "async"])
+def test_check_all_proxies_checks_in_priority_order(checker, engine):
+    checked = []
+    
+    def check_proxy_result(proxy, strict=True):
+        checked.append(proxy)
+        return CheckResult(proxy, True, errors=bytes([ErrorClass.OK]))
+    
+    checker.check_proxy_result = check_proxy_result
+    keys = checker.priority_keys(PROXIES, ["column"], start_row=2, priority_column="C")
+    
+    results = checker.check_all_proxies(PROXIES, delay=0, engine=engine, concurrency=1, priorities=keys)
+    
+    assert checked == ["10.0.0.3:8080", "10.0.0.4:8080", "10.0.0.1:8080", "10.0.0.2:8080"]
+    # 結果は元の行の順番のまま
+    assert [result.proxy for result in results] == PROXIES
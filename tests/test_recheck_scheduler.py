@@ -0,0 +1,97 @@
+import time
+import types
+
+import pytest
+
+import proxy_checker
+from proxy_checker import CheckResult, ErrorClass, RecheckScheduler
+
+PROXY = "http://10.0.0.1:8080"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """RecheckSchedulerが使う現在時刻（UNIX時間）を進められるようにする"""
+    clock = types.SimpleNamespace(now=1_700_000_000.0)
+    fake_time = types.SimpleNamespace(**{name: getattr(time, name) for name in ("monotonic", "perf_counter", "sleep")})
+    fake_time.time = lambda: clock.now
+    monkeypatch.setattr(proxy_checker, "time", fake_time)
+    return clock
+
+
+def test_interval_doubles_while_status_is_stable(tmp_path, clock):
+    scheduler = RecheckScheduler(str(tmp_path / "schedule.json"), stable_after=2, min_interval=100, max_interval=350)
+    intervals = []
+    for _ in range(5):
+        scheduler.record(PROXY, True)
+        intervals.append(scheduler.interval_for(PROXY))
+    assert intervals == [0, 100, 200, 350, 350]
+    
+    # ステータスが変わったら毎回チェックに戻る
+    scheduler.record(PROXY, False)
+    assert scheduler.interval_for(PROXY) == 0
+    assert scheduler.is_due(PROXY)
+
+
+def test_due_after_most_of_interval(tmp_path, clock):
+    scheduler = RecheckScheduler(str(tmp_path / "schedule.json"), stable_after=1, min_interval=1000)
+    assert scheduler.is_due(PROXY)
+    scheduler.record(PROXY, True)
+    
+    assert not scheduler.is_due(PROXY)
+    clock.now += 899
+    assert not scheduler.is_due(PROXY)
+    clock.now += 1
+    assert scheduler.is_due(PROXY)
+    assert not scheduler.is_due(PROXY, now=clock.now - 1)
+
+
+def test_save_load_and_eviction(tmp_path, clock):
+    path = str(tmp_path / "schedule.json")
+    scheduler = RecheckScheduler(path, stable_after=1, max_entries=2)
+    scheduler.record("http://a:1", True)
+    scheduler.record("http://b:1", True)
+    scheduler.record("http://a:1", True)
+    scheduler.record("http://c:1", False)
+    scheduler.save()
+    
+    loaded = RecheckScheduler(path, stable_after=1)
+    assert len(loaded) == 2
+    assert loaded.interval_for("http://a:1") == 2 * loaded.min_interval
+    # 最も古く記録したbは消えている
+    assert loaded.interval_for("http://b:1") == 0
+
+
+def test_broken_file_is_discarded(tmp_path):
+    path = tmp_path / "schedule.json"
+    path.write_text("[{", encoding="utf-8")
+    assert len(RecheckScheduler(str(path))) == 0
+
+
+def test_check_all_proxies_skips_stable_proxies(tmp_path, clock, make_checker):
+    scheduler = RecheckScheduler(str(tmp_path / "schedule.json"), stable_after=2, min_interval=600)
+    checker = make_checker(recheck_scheduler=scheduler)
+    checked = []
+    
+    def check_proxy_result(proxy, strict=True):
+        checked.append(proxy)
+        return CheckResult(proxy, True, errors=bytes([ErrorClass.OK]))
+    
+    checker.check_proxy_result = check_proxy_result
+    proxies = ["10.0.0.1:8080", "10.0.0.2:8080"]
+    # 10.0.0.1は2回続けて有効だったため、600秒の間隔が空くまでチェックしない
+    for _ in range(2):
+        scheduler.record(checker.normalize_proxy(proxies[0]), True)
+    
+    results = checker.check_all_proxies(proxies, engine="serial", delay=0)
+    
+    assert checked == ["10.0.0.2:8080"]
+    assert results[0] is None and results[1].is_valid
+    assert checker.stats["not_due"] == 1
+    assert (tmp_path / "schedule.json").exists()
+    
+    clock.now += 600
+    checked.clear()
+    checker.check_all_proxies(proxies, engine="serial", delay=0)
+    assert checked == proxies
+    assert checker.stats["not_due"] == 0
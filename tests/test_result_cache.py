@@ -0,0 +1,87 @@
+import types
+
+import pytest
+
+import proxy_checker
+from proxy_checker import CheckResult, ErrorClass, ResultCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """ResultCacheが使う現在時刻（UNIX時間）を進められるようにする"""
+    clock = types.SimpleNamespace(now=1_700_000_000.0)
+    monkeypatch.setattr(proxy_checker, "time", types.SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+def result(proxy, is_valid=True):
+    return CheckResult(proxy, is_valid, errors=bytes([ErrorClass.OK if is_valid else ErrorClass.TIMEOUT]))
+
+
+def test_valid_and_invalid_results_expire_separately(tmp_path, clock):
+    cache = ResultCache(str(tmp_path / "cache.json"), ttl_valid=1800, ttl_invalid=300)
+    cache.put("http://10.0.0.1:8080", True, result("10.0.0.1:8080", True))
+    cache.put("http://10.0.0.2:8080", True, result("10.0.0.2:8080", False))
+    
+    clock.now += 299
+    assert cache.get("http://10.0.0.2:8080", True) is not None
+    clock.now += 2
+    assert cache.get("http://10.0.0.2:8080", True) is None
+    assert len(cache) == 1
+    
+    hit = cache.get("http://10.0.0.1:8080", True)
+    assert hit.is_valid and hit.cached
+    assert hit.cached_at == clock.now - 301
+    clock.now += 1500
+    assert cache.get("http://10.0.0.1:8080", True) is None
+
+
+def test_result_from_other_mode_is_not_used(tmp_path, clock):
+    cache = ResultCache(str(tmp_path / "cache.json"))
+    cache.put("http://10.0.0.1:8080", True, result("10.0.0.1:8080"))
+    assert cache.get("http://10.0.0.1:8080", False) is None
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path, clock):
+    cache = ResultCache(str(tmp_path / "cache.json"), max_entries=2)
+    cache.put("a", True, result("a"))
+    cache.put("b", True, result("b"))
+    cache.get("a", True)
+    cache.put("c", True, result("c"))
+    
+    assert cache.get("b", True) is None
+    assert cache.get("a", True) is not None
+    assert cache.get("c", True) is not None
+
+
+def test_entries_survive_save_and_load(tmp_path, clock):
+    path = str(tmp_path / "cache.json")
+    cache = ResultCache(path)
+    cache.put("http://10.0.0.1:8080", True, result("10.0.0.1:8080", False))
+    cache.save()
+    
+    loaded = ResultCache(path).get("http://10.0.0.1:8080", True)
+    assert loaded.proxy == "10.0.0.1:8080"
+    assert not loaded.is_valid
+    assert ErrorClass(loaded.errors[0]) == ErrorClass.TIMEOUT
+
+
+def test_broken_file_is_discarded(tmp_path, capsys):
+    path = tmp_path / "cache.json"
+    path.write_text("{broken", encoding='utf-8')
+    assert len(ResultCache(str(path))) == 0
+    assert "キャッシュを破棄します" in capsys.readouterr().out
+
+
+def test_cached_proxies_are_not_checked_again(tmp_path, echo_proxy, make_checker):
+    proxy = f"127.0.0.1:{echo_proxy.server_address[1]}"
+    checker = make_checker(test_urls=["http://example.test/ip"])
+    checker.result_cache = ResultCache(str(tmp_path / "cache.json"))
+    
+    first = checker.check_all_proxies([proxy], strict=False)
+    second = checker.check_all_proxies([proxy], strict=False)
+    
+    assert len(echo_proxy.requests) == 1
+    assert not first[0].cached and second[0].cached
+    assert second[0].is_valid
+    assert checker.stats['cache_hits'] == 1
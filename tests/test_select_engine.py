@@ -0,0 +1,19 @@
+from proxy_checker import ProxyChecker, select_engine
+
+
+def test_default_engine_without_delay(capsys):
+    assert select_engine(None, delay_given=False) == ProxyChecker.DEFAULT_ENGINE
+    assert capsys.readouterr().out == ""
+
+
+def test_delay_keeps_serial_engine(capsys):
+    assert select_engine(None, delay_given=True) == "serial"
+    assert "serialエンジン" in capsys.readouterr().out
+
+
+def test_delay_with_concurrent_engine_warns(capsys):
+    assert select_engine("async", delay_given=True) == "async"
+    assert "delayは使われません" in capsys.readouterr().out
+    
+    assert select_engine("serial", delay_given=True) == "serial"
+    assert capsys.readouterr().out == ""
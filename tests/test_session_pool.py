@@ -0,0 +1,56 @@
+from proxy_checker import ProxySessionPool
+
+
+def test_session_per_proxy():
+    pool = ProxySessionPool()
+    session = pool.get("http://10.0.0.1:8080")
+    
+    assert pool.get("http://10.0.0.1:8080") is session
+    assert pool.get("http://10.0.0.2:8080") is not session
+    assert session.proxies == {'http': "http://10.0.0.1:8080", 'https': "http://10.0.0.1:8080"}
+    assert not session.trust_env
+    assert len(pool) == 2
+
+
+def test_least_recently_used_session_is_evicted():
+    pool = ProxySessionPool(max_size=2)
+    first = pool.get("http://10.0.0.1:8080")
+    second = pool.get("http://10.0.0.2:8080")
+    pool.get("http://10.0.0.1:8080")
+    pool.get("http://10.0.0.3:8080")
+    
+    assert len(pool) == 2
+    assert pool.get("http://10.0.0.1:8080") is first
+    assert pool.get("http://10.0.0.2:8080") is not second
+
+
+def test_close_discards_sessions():
+    pool = ProxySessionPool()
+    session = pool.get("http://10.0.0.1:8080")
+    pool.close()
+    
+    assert len(pool) == 0
+    assert pool.get("http://10.0.0.1:8080") is not session
+
+
+def test_checks_reuse_connection(echo_proxy, make_checker):
+    checker = make_checker(test_urls=["http://example.test/ip"])
+    proxy = f"127.0.0.1:{echo_proxy.server_address[1]}"
+    
+    for _ in range(3):
+        assert checker.check_proxy_result(proxy, strict=False, timeout=2).is_valid
+    
+    assert len(echo_proxy.requests) == 3
+    assert len(echo_proxy.connections) == 1
+
+
+def test_environment_proxy_is_ignored(echo_proxy, make_checker, monkeypatch):
+    # 環境変数のプロキシ（待ち受けていないポート）ではなく、チェックするプロキシを経由する
+    for name in ("HTTP_PROXY", "HTTPS_PROXY", "ALL_PROXY", "http_proxy", "https_proxy", "all_proxy"):
+        monkeypatch.setenv(name, "http://127.0.0.1:1")
+    checker = make_checker(test_urls=["http://example.test/ip"])
+    
+    result = checker.check_proxy_result(f"127.0.0.1:{echo_proxy.server_address[1]}", strict=False, timeout=2)
+    
+    assert result.is_valid
+    assert echo_proxy.requests == ["/ip"]
@@ -0,0 +1,74 @@
+from proxy_checker import SheetSnapshot
+from tests.fake_sheets import InMemoryWorksheet
+
+ROWS = [
+    ["プロキシ", "ステータス", "メッセージ", "応答時間"],
+    ["10.0.0.1:8080", "有効", "成功", "12"],
+    ["10.0.0.2:8080", "無効", "タイムアウト"],
+    ["10.0.0.3:8080"],
+]
+
+
+def fetch(columns="ABCD"):
+    return SheetSnapshot.fetch(InMemoryWorksheet(ROWS), list(columns))
+
+
+def test_unchanged_updates_give_empty_diff():
+    snapshot = fetch()
+    updates = {
+        2: {'B': "有効", 'C': "成功", 'D': "12"},
+        3: {'B': "無効", 'C': "タイムアウト", 'D': ""},
+        4: {'B': ""},
+    }
+    assert snapshot.changed_cells(updates) == {}
+    assert snapshot.changed_cells({}) == {}
+
+
+def test_only_changed_cells_and_rows_remain():
+    snapshot = fetch()
+    updates = {
+        2: {'B': "有効", 'C': "成功 (3/3)"},
+        3: {'B': "無効", 'C': "タイムアウト"},
+        4: {'B': "有効", 'C': "成功"},
+        # スナップショットより後ろの行は空として比較する
+        5: {'A': "", 'B': "無効"},
+    }
+    assert snapshot.changed_cells(updates) == {
+        2: {'C': "成功 (3/3)"},
+        4: {'B': "有効", 'C': "成功"},
+        5: {'B': "無効"},
+    }
+
+
+def test_numbers_compare_as_displayed_text():
+    snapshot = fetch()
+    assert snapshot.changed_cells({2: {'D': 12.0}}) == {}
+    assert snapshot.changed_cells({2: {'D': 12}}) == {}
+    assert snapshot.changed_cells({2: {'D': 12.5}}) == {2: {'D': 12.5}}
+
+
+def test_columns_outside_snapshot_are_always_kept():
+    snapshot = fetch("AB")
+    assert not snapshot.covers("C")
+    assert snapshot.changed_cells({2: {'B': "有効", 'C': "成功", 'E': ""}}) == {2: {'C': "成功", 'E': ""}}
+
+
+def test_fetched_range_covers_requested_empty_columns():
+    # 取得した値より右の列でも、要求した列は空としてスナップショットに含める
+    snapshot = SheetSnapshot.fetch(InMemoryWorksheet([["プロキシ"], ["10.0.0.1:8080"]]), ["A", "E"])
+    assert snapshot.covers("E")
+    assert snapshot.changed_cells({2: {'E': ""}}) == {}
+
+
+def test_diff_writes_skip_unchanged_cells(make_checker):
+    checker = make_checker(ROWS)
+    checker.load_snapshot("A", "B", "C", "D")
+    updates = {2: {'B': "有効", 'C': "成功"}, 3: {'B': "有効", 'C': "成功"}}
+    
+    checker._write_cell_updates(checker._changed_cell_updates(updates))
+    assert checker.worksheet.calls['batch_update'] == 1
+    assert checker.worksheet.rows[2][:3] == ["10.0.0.2:8080", "有効", "成功"]
+    
+    # 書き込んだ値でスナップショットを取り直すと、同じ更新は書き込まない
+    checker.load_snapshot("A", "B", "C", "D")
+    assert checker._changed_cell_updates(updates) == {}
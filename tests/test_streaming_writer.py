@@ -0,0 +1,79 @@
+import time
+
+import pytest
+
+from proxy_checker import CheckResult, ErrorClass, ProxyChecker, StreamingResultWriter
+
+
+class FailingWrites:
+    """最初のfailures回のbatch_updateを失敗させる"""
+    
+    def __init__(self, worksheet, failures):
+        self.worksheet = worksheet
+        self.failures = failures
+    
+    def __getattr__(self, name):
+        return getattr(self.worksheet, name)
+    
+    def batch_update(self, data, **kwargs):
+        self.worksheet.calls['batch_update_attempt'] += 1
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("書き込み失敗")
+        return self.worksheet.batch_update(data, **kwargs)
+
+
+def make_writer(make_checker, failures, count=20):
+    proxies = [f"10.0.0.{i}:8080" for i in range(1, count + 1)]
+    checker = make_checker([["プロキシ", "ステータス", "メッセージ", "チェック日時", "前回ステータス"]]
+                           + [[proxy] for proxy in proxies])
+    worksheet = checker.worksheet
+    checker.worksheet = FailingWrites(worksheet, failures)
+    checker.api_scheduler.max_retries = 0
+    writer = StreamingResultWriter(checker, flush_every=1, flush_interval=0.05)
+    writer.start()
+    return writer, worksheet, proxies
+
+
+def test_failed_flush_backs_off(make_checker, capsys):
+    writer, worksheet, proxies = make_writer(make_checker, failures=1000)
+    for i, proxy in enumerate(proxies):
+        writer.add(i, CheckResult(proxy, True, errors=bytes([ErrorClass.OK])))
+        time.sleep(0.01)
+    time.sleep(0.3)
+    
+    # 書き込み待ちが flush_every を超えていても、失敗後は再試行の時刻まで待つ
+    assert worksheet.calls['batch_update_attempt'] <= 2
+    assert "秒後に再試行します" in capsys.readouterr().out
+    with pytest.raises(RuntimeError):
+        writer.close()
+    assert len(writer._pending) == len(proxies)
+
+
+def test_failed_rows_written_on_close(make_checker):
+    writer, worksheet, proxies = make_writer(make_checker, failures=1)
+    for i, proxy in enumerate(proxies):
+        writer.add(i, CheckResult(proxy, i != 3, errors=bytes([ErrorClass.OK])))
+    time.sleep(0.1)
+    writer.close()
+    
+    assert [worksheet._value(row, 2) for row in range(2, len(proxies) + 2)] == \
+        ["無効" if i == 3 else "有効" for i in range(len(proxies))]
+
+
+def test_run_streams_writes_by_default(make_checker, echo_proxy, monkeypatch):
+    writers = []
+    start = StreamingResultWriter.start
+    
+    def record_start(writer):
+        writers.append(writer)
+        start(writer)
+    monkeypatch.setattr(StreamingResultWriter, 'start', record_start)
+    proxy = f"127.0.0.1:{echo_proxy.server_address[1]}"
+    checker = make_checker([["プロキシ"], [proxy]], test_urls=["http://example.test/ip"])
+    
+    checker.run(strict=False, track_changes=False)
+    
+    assert ProxyChecker.DEFAULT_STREAM_WRITES
+    assert len(writers) == 1
+    assert checker.worksheet._value(2, 2) == "有効"
@@ -0,0 +1,27 @@
+from proxy_checker import LatencyHistory
+
+TEST_URLS = ["http://example.test/a", "http://example.test/b", "http://example.test/c"]
+
+
+def test_limit_follows_timeout(echo_proxy, make_checker):
+    echo_proxy.delay = 0.3
+    proxy = f"127.0.0.1:{echo_proxy.server_address[1]}"
+    checker = make_checker(test_urls=TEST_URLS)
+    
+    assert checker.check_proxy_result(proxy, timeout=2).is_valid
+    checker.strict_max_latency = 0.1
+    assert not checker.check_proxy_result(proxy, timeout=2).is_valid
+
+
+def test_adaptive_timeout_raises_limit(echo_proxy, tmp_path, make_checker):
+    # 既定のタイムアウト（0.2秒）より遅いが、履歴から求めたタイムアウト内に応答するプロキシ
+    echo_proxy.delay = 0.3
+    proxy = f"127.0.0.1:{echo_proxy.server_address[1]}"
+    checker = make_checker(test_urls=TEST_URLS)
+    checker.timeout = 0.2
+    checker.latency_history = LatencyHistory(str(tmp_path / "history.json"), floor=0.1, min_samples=1)
+    checker.latency_history.record(checker.normalize_proxy(proxy), [0.3, 0.3, 0.3])
+    
+    result = checker.check_proxy_result(proxy)
+    assert result.timeout == 0.6
+    assert result.is_valid
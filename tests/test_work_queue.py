@@ -0,0 +1,135 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from proxy_checker import CheckResult
+from work_queue import WorkQueue, run_worker
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return WorkQueue(str(tmp_path / "queue.db"))
+
+
+def proxies(count):
+    return [f"10.0.0.{i}:8080" for i in range(count)]
+
+
+def test_units_split_in_order(queue):
+    queue.create_job(proxies(5), unit_size=2)
+    units = [queue.lease("w", 60) for _ in range(3)]
+    assert [[index for index, _ in items] for _, _, items in units] == [[0, 1], [2, 3], [4]]
+    assert queue.lease("w", 60) is None
+
+
+def test_expired_lease_is_requeued(queue):
+    job = queue.create_job(proxies(3), unit_size=10, settings={'timeout': 5})
+    unit_id, settings, items = queue.lease("w1", lease_seconds=0.05)
+    assert settings == {'timeout': 5}
+    assert queue.lease("w2", 60) is None
+    time.sleep(0.1)
+    
+    # 期限が切れると、処理中のワーカーがいないものとして未処理に数え、別のワーカーが取り出せる
+    assert queue.progress(job) == {'pending': 1, 'leased': 0, 'done': 0}
+    assert queue.lease("w2", 60)[0] == unit_id
+    assert queue.progress(job) == {'pending': 0, 'leased': 1, 'done': 0}
+    
+    # 元のワーカーは延長も書き戻しもできない
+    assert not queue.renew(unit_id, "w1", 60)
+    assert not queue.complete(unit_id, "w1", [(0, {'proxy': items[0][1], 'is_valid': True})])
+    assert queue.complete(unit_id, "w2", [(0, {'proxy': items[0][1], 'is_valid': False})])
+    assert queue.collect(job) == [(0, {'proxy': items[0][1], 'is_valid': False})]
+    assert queue.collect(job) == []
+
+
+def test_released_unit_is_leased_again(queue):
+    queue.create_job(proxies(2), unit_size=1)
+    unit_id, _, _ = queue.lease("w1", 60)
+    queue.release(unit_id, "w1")
+    assert queue.lease("w2", 60)[0] == unit_id
+
+
+class FakeChecker:
+    """チェックの代わりに、停止が要求されるまで待つ"""
+    
+    def __init__(self, on_check=None):
+        self.stop_requested = threading.Event()
+        self.timeout = 10
+        self.on_check = on_check
+        self.checked = 0
+        self.stop_events = []
+    
+    def check_all_proxies(self, proxies, strict=True, engine="async", concurrency=20, stop_event=None):
+        self.checked += 1
+        self.stop_events.append(stop_event)
+        if self.on_check:
+            self.on_check(self)
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            if self.stop_requested.is_set() or stop_event.is_set():
+                return [None] * len(proxies)
+            time.sleep(0.01)
+        return [CheckResult(proxy, True) for proxy in proxies]
+
+
+def test_worker_aborts_unit_when_renew_fails(queue, monkeypatch):
+    job = queue.create_job(proxies(2), unit_size=10)
+    monkeypatch.setattr(queue, 'renew', lambda *args: False)
+    checker = FakeChecker()
+    started = time.monotonic()
+    run_worker(queue, checker, worker_id="w1", lease_seconds=0.15, exit_when_idle=True)
+    
+    assert time.monotonic() - started < 2
+    # 中断するのは作業単位のチェックだけで、ワーカーの停止要求は設定しない
+    assert not checker.stop_requested.is_set()
+    assert checker.stop_events[0].is_set()
+    assert queue.collect(job) == []
+
+
+def test_worker_aborts_unit_when_renew_keeps_failing(queue, monkeypatch, capsys):
+    job = queue.create_job(proxies(2), unit_size=10)
+    
+    def renew(*args):
+        raise sqlite3.OperationalError("database is locked")
+    
+    monkeypatch.setattr(queue, 'renew', renew)
+    run_worker(queue, FakeChecker(), worker_id="w1", lease_seconds=0.15, exit_when_idle=True)
+    
+    output = capsys.readouterr().out
+    assert "database is locked" in output
+    assert "リースの期限が切れるため" in output
+    assert queue.collect(job) == []
+
+
+def test_stop_request_during_unit_stops_worker(queue):
+    job = queue.create_job(proxies(4), unit_size=2)
+    # シグナルを受け取った場合と同じく、チェック中のchecker.stop_requestedを設定する
+    checker = FakeChecker(on_check=lambda c: c.stop_requested.set())
+    run_worker(queue, checker, worker_id="w1", lease_seconds=60)
+    
+    assert checker.stop_requested.is_set()
+    assert checker.checked == 1
+    assert queue.progress(job) == {'pending': 2, 'leased': 0, 'done': 0}
+
+
+def test_stop_event_stops_only_that_check(make_checker):
+    checker = make_checker()
+    stop_event = threading.Event()
+    stop_event.set()
+    
+    assert checker.check_all_proxies(["10.0.0.1:8080", "10.0.0.2:8080"], engine="async", stop_event=stop_event) == [None, None]
+    assert not checker.stop_requested.is_set()
+
+
+def test_coordinator_gives_up_without_workers(queue, capsys, make_checker):
+    checker = make_checker(work_queue=queue, work_idle_timeout=0.2)
+    received = []
+    
+    checker._check_proxies_distributed(proxies(3), strict=True, on_result=lambda *args: received.append(args),
+                                       poll_interval=0.05)
+    
+    assert received == []
+    assert "残りの3個のプロキシはチェックしません" in capsys.readouterr().out
+    assert queue.lease("w", 60) is None
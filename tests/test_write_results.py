@@ -0,0 +1,83 @@
+from proxy_checker import CheckResult, ErrorClass
+
+
+def updates_for(rows, columns="BCDE"):
+    return {row: {column: f"{column}{row}" for column in columns} for row in rows}
+
+
+def written_rows(worksheet, first_row, last_row, columns="BCDE"):
+    return {
+        row: {column: worksheet._value(row, ord(column) - ord('A') + 1) for column in columns}
+        for row in range(first_row, last_row + 1)
+    }
+
+
+def test_block_ranges_merge_contiguous_rows(make_checker):
+    checker = make_checker([])
+    ranges = checker._build_block_ranges(updates_for(range(2, 6)))
+    assert [r['range'] for r in ranges] == ['B2:E5']
+    assert ranges[0]['values'][0] == ['B2', 'C2', 'D2', 'E2']
+    assert ranges[0]['values'][-1] == ['B5', 'C5', 'D5', 'E5']
+
+
+def test_block_ranges_split_on_gap_and_column_set(make_checker):
+    checker = make_checker([])
+    updates = updates_for([2, 3, 5])
+    updates[6] = {'B': 'B6', 'C': 'C6'}
+    updates[7] = {'B': 'B7', 'E': 'E7'}
+    ranges = checker._build_block_ranges(updates)
+    assert [r['range'] for r in ranges] == ['B2:E3', 'B5:E5', 'B6:C6', 'B7:B7', 'E7:E7']
+
+
+def test_block_ranges_skip_rows_without_cells(make_checker):
+    checker = make_checker([])
+    updates = updates_for([2, 4])
+    updates[3] = {}
+    assert [r['range'] for r in checker._build_block_ranges(updates)] == ['B2:E2', 'B4:E4']
+
+
+def test_chunked_write_keeps_boundary_rows(make_checker):
+    checker = make_checker([])
+    # 2〜9行目は1行が4セル×(2バイト+4) = 24バイト。3行で上限に達するため、3行・3行・1行に分かれる
+    checker.MAX_WRITE_PAYLOAD_BYTES = 3 * 24
+    updates = updates_for(range(2, 9))
+    
+    assert checker._write_cell_updates(updates) == 3
+    assert checker.worksheet.calls['batch_update'] == 3
+    assert written_rows(checker.worksheet, 2, 8) == updates
+    # 範囲の最後の行の次の行には書き込まない
+    assert checker.worksheet._value(9, 2) == ""
+
+
+def test_chunked_write_row_larger_than_limit(make_checker):
+    checker = make_checker([])
+    checker.MAX_WRITE_PAYLOAD_BYTES = 10
+    updates = updates_for(range(2, 5))
+    assert checker._write_cell_updates(updates) == 3
+    assert written_rows(checker.worksheet, 2, 4) == updates
+
+
+def test_chunked_write_across_blocks(make_checker):
+    checker = make_checker([])
+    # 10行目以降は1行28バイト。4行目と10行目（24+28バイト）は別のブロックだが同じバッチに入る
+    checker.MAX_WRITE_PAYLOAD_BYTES = 56
+    updates = updates_for([2, 3, 4, 10, 11])
+    assert checker._write_cell_updates(updates) == 3
+    assert written_rows(checker.worksheet, 2, 4) == updates_for([2, 3, 4])
+    assert written_rows(checker.worksheet, 10, 11) == updates_for([10, 11])
+    assert written_rows(checker.worksheet, 5, 9) == {row: dict.fromkeys("BCDE", "") for row in range(5, 10)}
+
+
+def test_write_results_skips_unchecked_rows(make_checker):
+    proxies = [f"10.0.0.{i}:8080" for i in range(1, 6)]
+    checker = make_checker([["プロキシ"]] + [[proxy] for proxy in proxies])
+    results = [CheckResult(proxy, i % 2 == 0, errors=bytes([ErrorClass.OK])) for i, proxy in enumerate(proxies)]
+    results[2] = None
+    
+    checker.write_results(results, track_changes=False)
+    
+    worksheet = checker.worksheet
+    assert worksheet.rows[0][:4] == ["プロキシ", "ステータス", "メッセージ", "チェック日時"]
+    assert [worksheet._value(row, 2) for row in range(2, 7)] == ["有効", "無効", "", "無効", "有効"]
+    assert worksheet._value(4, 3) == "" and worksheet._value(4, 4) == ""
+    assert worksheet.calls['batch_update'] == 1
@@ -0,0 +1,314 @@
+"""
+分散チェック用の作業キュー
+コーディネーター（スプレッドシートの読み書きを行うプロセス）がプロキシを作業単位に分けて登録し、
+複数のワーカーが作業単位を取り出してチェックした結果を書き戻す
+
+キューはSQLiteのファイルで、コーディネーターとすべてのワーカーから同じファイルを参照する。
+取り出された作業単位には期限（リース）があり、期限までに結果が書き戻されなかった場合は
+（ワーカーが停止した場合など）別のワーカーが取り出せるようになる。
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import List, Dict, Tuple, Optional
+
+
+class WorkQueue:
+    """SQLiteファイルを使った作業キュー"""
+    
+    def __init__(self, path: str):
+        """
+        初期化（テーブルがない場合は作成する）
+        
+        Args:
+            path: キューのSQLiteファイルのパス
+        """
+        self.path = path
+        # 複数のプロセスから同時に読み書きするため、WALモードにする
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+        finally:
+            conn.close()
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job TEXT PRIMARY KEY,
+                    settings TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS units (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job TEXT NOT NULL,
+                    items TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    worker TEXT,
+                    lease_until REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    results TEXT,
+                    collected INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS units_status ON units (status, id)")
+    
+    def _connect(self) -> "_Transaction":
+        # 呼び出しごとに接続する（ワーカーのリース延長スレッドからも使うため）
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        return _Transaction(conn)
+    
+    def create_job(self, proxies: List[str], unit_size: int = 100, settings: Optional[Dict] = None) -> str:
+        """
+        プロキシを作業単位に分けて登録
+        
+        Args:
+            proxies: プロキシのリスト（この順番で取り出される）
+            unit_size: 1つの作業単位に含めるプロキシ数
+            settings: ワーカーに渡すチェックの設定（strict, test_urls, timeout, strict_max_latency）
+        
+        Returns:
+            ジョブID
+        """
+        job = uuid.uuid4().hex
+        unit_size = max(1, unit_size)
+        with self._connect() as conn:
+            conn.execute("INSERT INTO jobs (job, settings, created_at) VALUES (?, ?, ?)",
+                         (job, json.dumps(settings or {}, ensure_ascii=False), time.time()))
+            conn.executemany(
+                "INSERT INTO units (job, items) VALUES (?, ?)",
+                [
+                    (job, json.dumps([[i, proxies[i]] for i in range(start, min(start + unit_size, len(proxies)))],
+                                     ensure_ascii=False))
+                    for start in range(0, len(proxies), unit_size)
+                ]
+            )
+        return job
+    
+    def lease(self, worker: str, lease_seconds: float = 300) -> Optional[Tuple[int, Dict, List[Tuple[int, str]]]]:
+        """
+        未処理の作業単位を1つ取り出す（リースの期限が切れたものも対象）
+        
+        Args:
+            worker: ワーカーID
+            lease_seconds: リースの期限（秒）
+        
+        Returns:
+            (作業単位ID, チェックの設定, [(インデックス, プロキシ), ...]) または None
+        """
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT units.id, units.items, jobs.settings FROM units JOIN jobs ON units.job = jobs.job "
+                "WHERE units.status = 'pending' OR (units.status = 'leased' AND units.lease_until < ?) "
+                "ORDER BY units.id LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            unit_id, items, settings = row
+            conn.execute(
+                "UPDATE units SET status = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1 WHERE id = ?",
+                (worker, now + lease_seconds, unit_id)
+            )
+        return unit_id, json.loads(settings), [tuple(item) for item in json.loads(items)]
+    
+    def renew(self, unit_id: int, worker: str, lease_seconds: float = 300) -> bool:
+        """
+        リースの期限を延長（チェックに時間がかかる場合）
+        
+        Returns:
+            延長できたかどうか（別のワーカーに取り出された場合はFalse）
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE units SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                (time.time() + lease_seconds, unit_id, worker)
+            )
+            return cursor.rowcount > 0
+    
+    def complete(self, unit_id: int, worker: str, results: List[Tuple[int, Dict]]) -> bool:
+        """
+        作業単位の結果を書き戻す
+        
+        Args:
+            unit_id: 作業単位ID
+            worker: ワーカーID
+            results: [(インデックス, チェック結果（CheckResult.to_dictの辞書）), ...]
+        
+        Returns:
+            書き戻せたかどうか（リースの期限が切れて別のワーカーに取り出された場合はFalse）
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE units SET status = 'done', results = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                (json.dumps(results, ensure_ascii=False), unit_id, worker)
+            )
+            return cursor.rowcount > 0
+    
+    def release(self, unit_id: int, worker: str):
+        """取り出した作業単位を処理せずに戻す（ワーカーを停止する場合）"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE units SET status = 'pending', worker = NULL, lease_until = NULL "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (unit_id, worker)
+            )
+    
+    def collect(self, job: str) -> List[Tuple[int, Dict]]:
+        """
+        まだ受け取っていない完了済みの結果を受け取る
+        
+        Args:
+            job: ジョブID
+        
+        Returns:
+            [(インデックス, チェック結果), ...]
+        """
+        collected = []
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, results FROM units WHERE job = ? AND status = 'done' AND collected = 0", (job,)
+            ).fetchall()
+            for unit_id, results in rows:
+                conn.execute("UPDATE units SET collected = 1 WHERE id = ?", (unit_id,))
+                collected.extend((index, result) for index, result in json.loads(results))
+        return collected
+    
+    def progress(self, job: str) -> Dict[str, int]:
+        """
+        ジョブの作業単位の状態ごとの数（"pending", "leased", "done"）
+        
+        リースの期限が切れた作業単位は、処理しているワーカーがいないため"pending"に数える。
+        """
+        counts = {'pending': 0, 'leased': 0, 'done': 0}
+        with self._connect() as conn:
+            for status, count in conn.execute(
+                "SELECT CASE WHEN status = 'leased' AND lease_until < ? THEN 'pending' ELSE status END AS state, "
+                "COUNT(*) FROM units WHERE job = ? GROUP BY state", (time.time(), job)
+            ):
+                counts[status] = count
+        return counts
+    
+    def delete_job(self, job: str):
+        """ジョブを削除（残っている作業単位はワーカーに取り出されなくなる）"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM units WHERE job = ?", (job,))
+            conn.execute("DELETE FROM jobs WHERE job = ?", (job,))
+
+
+class _Transaction:
+    """with文の間を1つのトランザクション（BEGIN IMMEDIATE）にし、終了時に接続を閉じる"""
+    
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+    
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+    
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.conn.close()
+
+
+def run_worker(queue: WorkQueue, checker, worker_id: Optional[str] = None, concurrency: int = 20,
+               lease_seconds: float = 300, poll_interval: float = 2.0, exit_when_idle: bool = False):
+    """
+    キューから作業単位を取り出してチェックし、結果を書き戻すことを繰り返す
+    
+    checker.stop_requestedが設定されると、実行中のチェックの完了を待って終了する
+    （途中までの作業単位はキューに戻す）。リースを延長できなくなった作業単位は、
+    別のワーカーに引き継がれるため、チェックを中断して結果を書き戻さない。
+    
+    Args:
+        queue: 作業キュー
+        checker: チェックに使うProxyChecker（スプレッドシートには接続しない）
+        worker_id: ワーカーID（Noneの場合はホスト名とプロセスID）
+        concurrency: 同時にチェックするプロキシ数
+        lease_seconds: リースの期限（秒）。チェック中は期限の1/3ごとに延長する
+        poll_interval: 作業単位がない場合に待つ秒数
+        exit_when_idle: 作業単位がなくなったら終了する
+    """
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    print(f"ワーカー {worker_id} を開始しました（キュー: {queue.path}）")
+    
+    while not checker.stop_requested.is_set():
+        try:
+            unit = queue.lease(worker_id, lease_seconds)
+        except sqlite3.Error as e:
+            # キューのファイルが一時的にロックされている場合など
+            print(f"作業単位の取り出しエラー: {e}")
+            checker.stop_requested.wait(poll_interval)
+            continue
+        if unit is None:
+            if exit_when_idle:
+                break
+            checker.stop_requested.wait(poll_interval)
+            continue
+        
+        unit_id, settings, items = unit
+        checker.test_urls = settings.get('test_urls')
+        checker.timeout = settings.get('timeout', checker.timeout)
+        checker.strict_max_latency = settings.get('strict_max_latency')
+        print(f"\n作業単位 {unit_id} を処理しています（{len(items)}個のプロキシ）")
+        
+        lease_lost = threading.Event()
+        finished = threading.Event()
+        
+        # チェック中はリースを延長し続ける（延長できなければ、別のワーカーに引き継がれるためチェックを中断する）
+        def keep_lease():
+            renewed_at = time.monotonic()
+            while not finished.wait(lease_seconds / 3):
+                try:
+                    if queue.renew(unit_id, worker_id, lease_seconds):
+                        renewed_at = time.monotonic()
+                        continue
+                    print(f"作業単位 {unit_id} のリースが別のワーカーに引き継がれたため、チェックを中断します")
+                except sqlite3.Error as e:
+                    print(f"作業単位 {unit_id} のリースの延長エラー: {e}")
+                    # 期限が切れるまでは次の延長を試す
+                    if time.monotonic() - renewed_at + lease_seconds / 3 < lease_seconds:
+                        continue
+                    print(f"作業単位 {unit_id} のリースの期限が切れるため、チェックを中断します")
+                lease_lost.set()
+                return
+        
+        renewer = threading.Thread(target=keep_lease, daemon=True)
+        renewer.start()
+        try:
+            # リースを失った場合はこの作業単位のチェックだけを止める（ワーカーの停止はchecker.stop_requested）
+            results = checker.check_all_proxies(
+                [proxy for _, proxy in items], strict=settings.get('strict', True),
+                engine="async", concurrency=concurrency, stop_event=lease_lost
+            )
+        finally:
+            finished.set()
+            renewer.join()
+        
+        if lease_lost.is_set():
+            continue
+        if any(result is None for result in results):
+            # 停止が要求されて最後までチェックしなかった
+            queue.release(unit_id, worker_id)
+            break
+        for result in results:
+            result.worker = worker_id
+        try:
+            completed = queue.complete(unit_id, worker_id,
+                                       [(index, result.to_dict()) for (index, _), result in zip(items, results)])
+        except sqlite3.Error as e:
+            # 書き戻せなかった作業単位は、リースの期限が切れると別のワーカーがチェックし直す
+            print(f"作業単位 {unit_id} の結果の書き戻しエラー: {e}")
+            continue
+        if not completed:
+            print(f"作業単位 {unit_id} は別のワーカーに引き継がれたため、結果を破棄しました")
+    
+    print(f"ワーカー {worker_id} を終了しました")